@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Analysis process pool
+Runs the CPU-bound text work on scraped results (insight indicator matching
+and near-duplicate signatures) in worker processes, so it uses every core
+and never holds up the thread that keeps searches in flight.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from insight_analyzer import InsightAnalyzer
+from near_duplicates import NearDuplicateIndex, content_text
+
+# Per-process state, built once by _init_worker
+_analyzer = None
+_near_duplicates = None
+
+
+def _init_worker(analyze, min_tokens):
+    global _analyzer, _near_duplicates
+    _analyzer = InsightAnalyzer() if analyze else None
+    _near_duplicates = (
+        NearDuplicateIndex(min_tokens=min_tokens) if min_tokens is not None else None
+    )
+
+
+def _analyze_fields(fields):
+    """(insight, signature) per (title, description, markdown); None when disabled"""
+    analyses = []
+    for title, description, markdown in fields:
+        insight = (
+            _analyzer.analyze_fields(title, description, markdown) if _analyzer else None
+        )
+        signature = (
+            _near_duplicates.signature(content_text(title, description, markdown))
+            if _near_duplicates
+            else None
+        )
+        analyses.append((insight, signature))
+    return analyses
+
+
+class AnalysisPool:
+    """Process pool computing insights and near-duplicate signatures of results"""
+
+    def __init__(self, workers=None, analyze=True, min_tokens=None):
+        """min_tokens enables signatures (see NearDuplicateIndex); None skips them"""
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(analyze, min_tokens),
+        )
+
+    @staticmethod
+    def _fields(results):
+        # Only the text crosses the process boundary, not the records
+        return [
+            (result.title, result.description, result.markdown) for result in results
+        ]
+
+    def submit(self, results):
+        """Analyze results in one worker; the future yields one pair per result"""
+        return self.executor.submit(_analyze_fields, self._fields(results))
+
+    def analyze(self, results):
+        """Analyze results split across all workers and wait for them"""
+        fields = self._fields(results)
+        size = max(1, -(-len(fields) // self.workers))
+        chunks = [fields[i : i + size] for i in range(0, len(fields), size)]
+        return list(chain.from_iterable(self.executor.map(_analyze_fields, chunks)))
+
+    def close(self):
+        self.executor.shutdown()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark
+Runs RedditSearchScraper end to end against FakeFirecrawl and reports
+queries per minute, result-processing throughput, checkpoint cost per query
+and peak memory for growing result counts, without network access.
+
+    python3 benchmark.py                          # 10^2, 10^4 and 10^6 results
+    python3 benchmark.py 100 10000 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+from fake_firecrawl import FakeFirecrawl
+from rate_limiter import TokenBucket
+from retry_policy import RetryPolicy
+from scraper_config import ADAPTIVE_CONFIG, GENERATOR_CONFIG, SCRAPING_CONFIG
+
+try:
+    import resource
+
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+DEFAULT_SIZES = (10**2, 10**4, 10**6)
+
+# A rate no benchmark reaches, so only the fake's own behavior paces the run
+UNLIMITED_RPM = 10**9
+
+
+def benchmark_queries(count):
+    """Yield `count` distinct query objects spread over the configured subreddits"""
+    subreddits = GENERATOR_CONFIG["subreddits"]
+    for i in range(count):
+        subreddit = subreddits[i % len(subreddits)]
+        yield {
+            "query": f"benchmark query {i} site:reddit.com/r/{subreddit}",
+            "type": "subreddit_question",
+            "subreddit": subreddit,
+            "category": "subreddit_specific",
+        }
+
+
+def peak_memory_mb():
+    """Peak resident set size of this process in MB, None where unsupported"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_benchmark(num_results, options):
+    """Scrape enough fake queries for num_results results and measure the run
+
+    Runs in a scratch directory; meant to be called in a fresh process so the
+    peak memory belongs to this size alone.
+    """
+    from reddit_scraper import RedditSearchScraper
+
+    backend = FakeFirecrawl(
+        seed=options["seed"],
+        latency=options["latency"],
+        latency_jitter=options["latency_jitter"],
+        error_rate=options["error_rate"],
+        throttle_rate=options["throttle_rate"],
+        retry_after=options["retry_after"],
+        results_per_query=options["results_per_query"],
+        markdown_chars=options["markdown_chars"],
+    )
+    num_queries = math.ceil(num_results / options["results_per_query"])
+    concurrency = options["concurrency"]
+    SCRAPING_CONFIG["analysis_workers"] = options["analysis_workers"]
+    ADAPTIVE_CONFIG["enabled"] = options["adaptive"]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                scraper = RedditSearchScraper(
+                    search_backend=backend,
+                    rate_limiter=TokenBucket(
+                        options["rpm"] or UNLIMITED_RPM, concurrency
+                    ),
+                    search_cache=False,
+                )
+                # Retries are counted, not waited for
+                scraper.retry_policy = RetryPolicy(
+                    max_retries=options["max_retries"], base_delay=0, max_delay=0
+                )
+                scraper.scrape_and_save(
+                    queries=benchmark_queries(num_queries),
+                    limit_per_query=options["results_per_query"],
+                    progress_save=options["checkpoint"],
+                    concurrency=concurrency,
+                )
+                save_started = time.perf_counter()
+                scraper.save_results()
+                save_seconds = time.perf_counter() - save_started
+        finally:
+            os.chdir(cwd)
+
+    report = scraper.metrics.report()
+    counters = report["counters"]
+    adaptive = report["adaptive_concurrency"]
+    phases = report["phases"]
+    completed = counters.get("queries_completed", 0)
+    results = len(scraper.search_results)
+    process_seconds = phases.get("process", {}).get("total_seconds", 0)
+    checkpoint_seconds = phases.get("checkpoint", {}).get("total_seconds", 0)
+
+    return {
+        "target_results": num_results,
+        "queries": completed,
+        "results": results,
+        "elapsed_seconds": report["elapsed_seconds"],
+        "queries_per_minute": report["queries_per_minute"],
+        "results_per_second": (
+            round(results / process_seconds) if process_seconds else None
+        ),
+        "checkpoint_ms_per_query": (
+            round(checkpoint_seconds * 1000 / completed, 3) if completed else None
+        ),
+        "save_seconds": round(save_seconds, 3),
+        "peak_memory_mb": peak_memory_mb(),
+        "failed_queries": counters.get("queries_error", 0),
+        "retries": counters.get("retries", 0),
+        "backend": dict(backend.stats),
+        "adaptive_concurrency": (
+            {key: value for key, value in adaptive.items() if key != "history"}
+            if adaptive
+            else None
+        ),
+    }
+
+
+def print_row(row):
+    print(
+        f"{row['target_results']:>9} results | {row['queries']:>7} queries | "
+        f"{row['queries_per_minute'] or 0:>10.0f} q/min | "
+        f"{row['results_per_second'] or 0:>8} results/s | "
+        f"checkpoint {row['checkpoint_ms_per_query'] or 0:.3f} ms/query | "
+        f"save {row['save_seconds']:.2f}s | peak {row['peak_memory_mb']} MB"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline scraper benchmark")
+    parser.add_argument(
+        "sizes",
+        nargs="*",
+        type=int,
+        default=list(DEFAULT_SIZES),
+        help="result counts to benchmark (default: 100 10000 1000000)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds every fake search takes"
+    )
+    parser.add_argument(
+        "--latency-jitter",
+        type=float,
+        default=0.0,
+        help="up to this many extra seconds per search",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="fraction of searches failing with a 503",
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="fraction of searches throttled with a 429",
+    )
+    parser.add_argument(
+        "--retry-after", type=float, default=0, help="Retry-After seconds of 429s"
+    )
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--results-per-query", type=int, default=10)
+    parser.add_argument(
+        "--markdown-chars", type=int, default=2000, help="size of every scraped page"
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--analysis-workers",
+        type=int,
+        default=SCRAPING_CONFIG["analysis_workers"],
+        help="analysis processes (0 = analyze in the scrape loop)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="let the AIMD controller tune concurrency and rate (ADAPTIVE_CONFIG)",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=None,
+        help="rate limit in searches/minute (default: unlimited)",
+    )
+    parser.add_argument(
+        "--no-checkpoint",
+        dest="checkpoint",
+        action="store_false",
+        help="run without the progress journal",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark_report.json",
+        help="JSON file the measurements are written to",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Benchmark every size in its own process and save the measurements"""
+    args = parse_args(argv)
+    options = vars(args)
+    print(f"🏁 Benchmarking {', '.join(str(size) for size in args.sizes)} results...")
+
+    rows = []
+    for size in args.sizes:
+        # A fresh process per size keeps peak memory measurements separate
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            row = executor.submit(run_benchmark, size, options).result()
+        print_row(row)
+        rows.append(row)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"options": options, "runs": rows}, f, indent=2)
+    print(f"📊 Benchmark report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
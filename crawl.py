@@ -1,12 +1,29 @@
 #!/usr/bin/env python3
 """
 Reddit User Needs Discovery - Main Runner
-This is the main entry point that demonstrates the separated architecture.
+One entry point for the whole pipeline:
+
+    python3 crawl.py                  # system status and usage
+    python3 crawl.py generate         # write discovery_queries.json
+    python3 crawl.py scrape           # scrape the queries, from scratch
+    python3 crawl.py resume           # continue an interrupted scrape
+    python3 crawl.py summarize        # analytics over the result files
+    python3 crawl.py merge a.json b.json -o search_results.json
+    python3 crawl.py archive search_results.json    # -> .jsonl.gz
+    python3 crawl.py unarchive search_results.jsonl.gz
+
+Each command imports only the modules it needs, inside its handler, so
+status checks and --help return without loading the Firecrawl SDK or
+creating an API client.
 """
 
+import argparse
 import os
 import sys
 
+QUERY_FILES = ("discovery_queries.json", "discovery_queries.jsonl")
+PROGRESS_FILE = "search_results_progress.jsonl"
+
 
 def print_banner():
     """Print a nice banner"""
@@ -20,21 +37,29 @@ def print_banner():
 def print_usage():
     """Print usage instructions"""
     print("\n📖 USAGE:")
-    print("1. Generate queries:  python3 query_generator.py")
-    print("2. Run scraper:       python3 reddit_scraper.py")
+    print("1. Generate queries:  python3 crawl.py generate")
+    print("2. Run scraper:       python3 crawl.py scrape")
+    print("3. Resume a run:      python3 crawl.py resume")
+    print("4. Summarize:         python3 crawl.py summarize")
+    print("5. Merge results:     python3 crawl.py merge FILE... -o OUTPUT")
+    print("6. Compress results:  python3 crawl.py archive|unarchive FILE...")
     print("\n📁 FILES:")
-    print("• query_generator.py  - Generates and saves discovery queries to JSON")
-    print("• reddit_scraper.py   - Loads queries and scrapes Reddit for insights")
-    print("• crawl.py           - This main runner (shows usage)")
+    print("• simple_query_generator.py - Generates and saves discovery queries to JSON")
+    print("• reddit_scraper.py         - Loads queries and scrapes Reddit for insights")
+    print("• crawl.py                  - This main runner (status and subcommands)")
     print("\n🔧 SETUP:")
     print("• pip install firecrawl-py python-dotenv")
     print("• Set FIRECRAWL_API_KEY in .env file")
-    print("• Run query_generator.py first, then reddit_scraper.py")
+    print("• Run crawl.py generate first, then crawl.py scrape")
 
 
 def check_files():
     """Check if the required files exist"""
-    files_to_check = ["query_generator.py", "reddit_scraper.py", "requirements.txt"]
+    files_to_check = [
+        "simple_query_generator.py",
+        "reddit_scraper.py",
+        "requirements.txt",
+    ]
 
     print("\n📋 FILE STATUS:")
     all_exist = True
@@ -59,22 +84,20 @@ def check_environment():
     else:
         print("  ⚠️  .env file not found (create one with FIRECRAWL_API_KEY)")
 
-    # Check for query files
-    query_files = [
-        f
-        for f in os.listdir(".")
-        if f.startswith("discovery_queries_") and f.endswith(".json")
-    ]
+    # Check the known query and progress files instead of listing the directory,
+    # which is slow next to thousands of result and shard files
+    query_files = [f for f in QUERY_FILES if os.path.exists(f)]
     if query_files:
-        print(f"  ✅ Found {len(query_files)} query file(s)")
-        latest = max(query_files)
-        print(f"     Latest: {latest}")
+        print(f"  ✅ Found query file(s): {', '.join(query_files)}")
     else:
-        print("  ⚠️  No query files found (run query_generator.py first)")
+        print("  ⚠️  No query files found (run crawl.py generate first)")
 
+    if os.path.exists(PROGRESS_FILE):
+        print(f"  ↩️  Interrupted run found in {PROGRESS_FILE} (run crawl.py resume)")
 
-def main():
-    """Main function"""
+
+def cmd_status(args):
+    """Show usage and check the files and environment"""
     print_banner()
 
     print_usage()
@@ -86,8 +109,8 @@ def main():
     check_environment()
 
     print("\n🚀 QUICK START:")
-    print("1. python3 query_generator.py")
-    print("2. python3 reddit_scraper.py")
+    print("1. python3 crawl.py generate")
+    print("2. python3 crawl.py scrape")
 
     if not files_ok:
         print(
@@ -98,5 +121,135 @@ def main():
         print("\n✅ All files present. Ready to go!")
 
 
+def cmd_generate(args):
+    import simple_query_generator
+
+    simple_query_generator.main(args.output)
+
+
+def cmd_scrape(args):
+    import reddit_scraper
+
+    reddit_scraper.main(args.queries, resume=False)
+
+
+def cmd_resume(args):
+    if not os.path.exists(PROGRESS_FILE):
+        print(f"❌ No interrupted run to resume ({PROGRESS_FILE} not found).")
+        sys.exit(1)
+
+    import reddit_scraper
+
+    reddit_scraper.main(args.queries, resume=True)
+
+
+def cmd_summarize(args):
+    import result_analytics
+
+    result_analytics.main(args.pattern)
+
+
+def cmd_merge(args):
+    missing = [filename for filename in args.files if not os.path.exists(filename)]
+    if missing:
+        print(f"❌ Result file(s) not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    from sharded_crawl import merge_shards
+
+    merge_shards(args.files, args.output)
+
+
+def _force(args):
+    return ["--force"] if args.force else []
+
+
+def cmd_archive(args):
+    import result_archive
+
+    result_archive.main(["pack", *_force(args), *args.files])
+
+
+def cmd_unarchive(args):
+    import result_archive
+
+    result_archive.main(["unpack", *_force(args), *args.files])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Reddit user needs discovery pipeline"
+    )
+    parser.set_defaults(handler=cmd_status)
+    commands = parser.add_subparsers(title="commands")
+
+    status = commands.add_parser("status", help="show usage and check the setup")
+    status.set_defaults(handler=cmd_status)
+
+    generate = commands.add_parser("generate", help="generate discovery queries")
+    generate.add_argument(
+        "-o",
+        "--output",
+        default="discovery_queries.json",
+        help="query file to write (.json or .jsonl)",
+    )
+    generate.set_defaults(handler=cmd_generate)
+
+    for name, handler, description in (
+        ("scrape", cmd_scrape, "scrape the generated queries from scratch"),
+        ("resume", cmd_resume, "continue an interrupted scrape from its journal"),
+    ):
+        command = commands.add_parser(name, help=description)
+        command.add_argument(
+            "queries",
+            nargs="?",
+            default="discovery_queries.json",
+            help="query file to scrape",
+        )
+        command.set_defaults(handler=handler)
+
+    summarize = commands.add_parser("summarize", help="analytics over result files")
+    summarize.add_argument(
+        "pattern",
+        nargs="?",
+        default="search_results*.json",
+        help="glob pattern of the result files",
+    )
+    summarize.set_defaults(handler=cmd_summarize)
+
+    merge = commands.add_parser(
+        "merge", help="merge result files, deduplicated by canonical URL"
+    )
+    merge.add_argument("files", nargs="+", help="search_results JSON files")
+    merge.add_argument("-o", "--output", default="search_results.json")
+    merge.set_defaults(handler=cmd_merge)
+
+    archive = commands.add_parser(
+        "archive", help="compress result files into columnar .jsonl.gz archives"
+    )
+    archive.add_argument("files", nargs="+", help="search_results JSON files")
+    archive.add_argument(
+        "-f", "--force", action="store_true", help="overwrite existing archives"
+    )
+    archive.set_defaults(handler=cmd_archive)
+
+    unarchive = commands.add_parser(
+        "unarchive", help="convert archives back to search_results JSON files"
+    )
+    unarchive.add_argument("files", nargs="+", help=".jsonl.gz or .jsonl.zst archives")
+    unarchive.add_argument(
+        "-f", "--force", action="store_true", help="overwrite existing JSON files"
+    )
+    unarchive.set_defaults(handler=cmd_unarchive)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+    args.handler(args)
+
+
 if __name__ == "__main__":
     main()
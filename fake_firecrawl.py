@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Fake Firecrawl backend
+Deterministic in-process stand-in for the Firecrawl search API, with
+configurable latency, error rate, 429 throttling and result sizes, so the
+scraper can be benchmarked and exercised without network access.
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from search_backends import TransportError
+from url_index import canonical_url
+
+SUBREDDIT_IN_QUERY = re.compile(r"site:reddit\.com/r/(\w+)")
+
+# Words the generated pages are made of, including the insight indicators so
+# the analyzer does realistic work
+VOCABULARY = (
+    "I am frustrated and struggling with marketing for my small business",
+    "it is a real problem and a challenge to find customers",
+    "we tried email marketing but it didn't work and was too expensive",
+    "looking for a tool that helps with lead generation and sales",
+    "I wish there was an easier way to handle invoices and payments",
+    "would love to automate this, it is a waste of time",
+    "our revenue is growing but hiring is hard",
+    "does anyone have advice on scaling a SaaS product",
+    "need help with analytics, the dashboard is complicated",
+    "thanks, this worked for me and helped us get our first investors",
+)
+
+
+class FakeFirecrawl:
+    """Firecrawl-compatible search() and scrape_urls() with scripted behavior
+
+    Responses depend only on the seed, the query and how often it was tried,
+    so runs are reproducible regardless of thread scheduling.
+    """
+
+    def __init__(
+        self,
+        seed=0,
+        latency=0.0,
+        latency_jitter=0.0,
+        error_rate=0.0,
+        throttle_rate=0.0,
+        retry_after=0,
+        results_per_query=10,
+        markdown_chars=2000,
+    ):
+        self.seed = seed
+        # Seconds every call takes, plus up to latency_jitter more
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        # Fraction of calls failing with a 503 / being throttled with a 429
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        # Retry-After header sent with 429 responses, in seconds
+        self.retry_after = retry_after
+        self.results_per_query = results_per_query
+        self.markdown_chars = markdown_chars
+
+        self.lock = threading.Lock()
+        self.attempts = Counter()
+        self.stats = Counter()
+
+        # Pages are drawn from a pool of sentences: the insight sentences
+        # above plus filler made of random words, so every page is distinct
+        rng = self._rng("sentences")
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        words = [
+            "".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(2000)
+        ]
+        # About one sentence in four carries insight indicators
+        self.sentences = list(VOCABULARY) * 130 + [
+            " ".join(rng.choices(words, k=10)) for _ in range(4000)
+        ]
+        lengths = [len(sentence) + 2 for sentence in self.sentences]
+        average = sum(lengths) / len(lengths)
+        self.sentences_per_page = int(markdown_chars / average) + 1
+
+    def _rng(self, *parts):
+        digest = hashlib.sha1(repr((self.seed,) + parts).encode("utf-8")).digest()
+        return random.Random(digest)
+
+    def _delay(self, rng):
+        if self.latency or self.latency_jitter:
+            time.sleep(self.latency + rng.uniform(0, self.latency_jitter))
+
+    def _maybe_fail(self, rng):
+        roll = rng.random()
+        if roll < self.throttle_rate:
+            self.stats["throttled"] += 1
+            headers = {"Retry-After": str(self.retry_after)}
+            raise TransportError(
+                "Firecrawl returned 429: rate limit exceeded",
+                status_code=429,
+                response=SimpleNamespace(headers=headers),
+            )
+        if roll < self.throttle_rate + self.error_rate:
+            self.stats["errors"] += 1
+            raise TransportError(
+                "Firecrawl returned 503: service unavailable", status_code=503
+            )
+
+    def markdown(self, url):
+        """Deterministic page content of a URL"""
+        rng = self._rng("page", url)
+        page = ". ".join(rng.choices(self.sentences, k=self.sentences_per_page))
+        return page[: self.markdown_chars]
+
+    def search(self, query, limit=5, scrape_options=None, timeout=None, tbs=None):
+        with self.lock:
+            self.attempts[query] += 1
+            attempt = self.attempts[query]
+            self.stats["searches"] += 1
+
+        rng = self._rng(query, attempt)
+        self._delay(rng)
+        self._maybe_fail(rng)
+
+        match = SUBREDDIT_IN_QUERY.search(query)
+        subreddit = match.group(1) if match else "benchmark"
+        web = []
+        for i in range(min(limit, self.results_per_query)):
+            thread_id = hashlib.sha1(f"{query}|{i}".encode("utf-8")).hexdigest()[:8]
+            item = SimpleNamespace(
+                url=(
+                    f"https://www.reddit.com/r/{subreddit}/comments/{thread_id}/post_{i}/"
+                ),
+                title=f"{query} ({i})",
+                description=f"Result {i} for {query}",
+            )
+            # Searches without scrape options return metadata only, like Firecrawl
+            if scrape_options:
+                item.markdown = self.markdown(item.url)
+            web.append(item)
+        return SimpleNamespace(web=web)
+
+    def scrape_urls(self, urls, scrape_options=None):
+        """Batch scrape, return {canonical url: markdown}"""
+        urls = tuple(urls)
+        # Counted per URL set like searches per query, so a retried batch
+        # gets a fresh roll instead of failing the same way every time
+        key = ("batch", urls)
+        with self.lock:
+            self.attempts[key] += 1
+            attempt = self.attempts[key]
+            self.stats["batch_scrapes"] += 1
+        rng = self._rng("batch", urls, attempt)
+        self._delay(rng)
+        self._maybe_fail(rng)
+        return {canonical_url(url): self.markdown(url) for url in urls}
+
+
+def fake_backend_factory(api_key):
+    """Default FakeFirecrawl, e.g. for sharded_crawl.run_sharded(backend_factory=...)"""
+    return FakeFirecrawl()
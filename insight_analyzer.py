@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Insight Analyzer
+Scores pain and desire intensity and tags business terms in scraped content,
+using the indicator lists from ANALYSIS_CONFIG. Intensity is the density of
+indicators, per intensity_words words, so a long thread does not outscore a
+short post by length alone.
+"""
+
+import re
+import sys
+from collections import Counter
+
+from scraper_config import ANALYSIS_CONFIG
+
+PAIN = "pain"
+DESIRE = "desire"
+BUSINESS = "business"
+
+
+class InsightAnalyzer:
+    """Matches every indicator in a single pass with one precompiled regex"""
+
+    def __init__(self, analysis_config=None, min_intensity=1):
+        config = analysis_config or ANALYSIS_CONFIG
+        self.min_intensity = min_intensity
+        self.intensity_words = config.get("intensity_words", 1000)
+        self.intensity_min_words = config.get("intensity_min_words", 300)
+
+        # term (lowercased) -> kinds it counts towards
+        self.term_kinds = {}
+        for kind, key in (
+            (PAIN, "pain_indicators"),
+            (DESIRE, "desire_indicators"),
+            (BUSINESS, "business_terms"),
+        ):
+            for term in config.get(key, []):
+                self.term_kinds.setdefault(term.lower(), set()).add(kind)
+
+        # Longest terms first so "email marketing" wins over "marketing"
+        terms = sorted(self.term_kinds, key=len, reverse=True)
+        self.pattern = re.compile(
+            r"(?<!\w)(" + "|".join(re.escape(term) for term in terms) + r")(?!\w)",
+            re.IGNORECASE,
+        )
+
+    def analyze(self, text):
+        """Return intensity scores and business terms found in a piece of text"""
+        counts = {PAIN: 0, DESIRE: 0}
+        business_terms = Counter()
+
+        for match in self.pattern.finditer(text or ""):
+            # Interned so every result shares the same key phrase strings
+            term = sys.intern(match.group(1).lower())
+            for kind in self.term_kinds[term]:
+                if kind == BUSINESS:
+                    business_terms[term] += 1
+                else:
+                    counts[kind] += 1
+
+        # Texts shorter than intensity_min_words (a title and description
+        # whose page was not scraped) are scored as if that long
+        words = max(len((text or "").split()), self.intensity_min_words)
+        pain_intensity = self._intensity(counts[PAIN], words)
+        desire_intensity = self._intensity(counts[DESIRE], words)
+
+        if pain_intensity == 0 and desire_intensity == 0:
+            insight_type = "other"
+        elif pain_intensity >= desire_intensity:
+            insight_type = "pain_point"
+        else:
+            insight_type = "desire"
+
+        return {
+            "insight_type": insight_type,
+            "insight_intensity": max(pain_intensity, desire_intensity),
+            "pain_intensity": pain_intensity,
+            "desire_intensity": desire_intensity,
+            "key_phrases": [term for term, _ in business_terms.most_common()],
+        }
+
+    def _intensity(self, matches, words):
+        """Indicator matches per intensity_words words, on the 0-10 scale"""
+        return min(10, round(matches * self.intensity_words / words))
+
+    def analyze_fields(self, title, description, markdown):
+        """analyze() over a result's title, description and markdown"""
+        fields = (title, description, markdown)
+        return self.analyze("\n".join(field or "" for field in fields))
+
+    def analyze_result(self, result):
+        """Set insight fields on a SearchResult based on its title, description and markdown"""
+        insight = self.analyze_fields(result.title, result.description, result.markdown)
+        return self.apply(result, insight)
+
+    @staticmethod
+    def apply(result, insight):
+        """Set the fields of an analyze() dict on a SearchResult"""
+        for field, value in insight.items():
+            if field == "key_phrases":
+                value = tuple(value)
+            setattr(result, field, value)
+        return result
+
+    def analyze_stream(self, results):
+        """Lazily enrich results as they arrive, dropping those below min_intensity"""
+        return self.filter_stream(self.analyze_result(result) for result in results)
+
+    def filter_stream(self, results):
+        """Drop already analyzed results below min_intensity"""
+        for result in results:
+            if result.insight_intensity < self.min_intensity:
+                print(
+                    f"  🔇 Low intensity ({result.insight_intensity}) skipped: "
+                    f"{(result.title or '')[:60]}"
+                )
+                continue
+            yield result
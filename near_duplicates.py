@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection
+MinHash signatures of result content (title, description and markdown) in a
+banded LSH index, so the same thread reached through a different URL
+(old./www., with or without the slug, crossposts, mirrors) is recognized
+without comparing it against every stored result.
+"""
+
+import random
+import re
+import zlib
+from array import array
+
+TOKEN = re.compile(r"\w+")
+
+# Words per shingle
+SHINGLE_SIZE = 3
+# Signature length = bands * rows; 16 bands of 4 rows make texts with a
+# shingle Jaccard similarity of 0.7 candidates ~99% of the time
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+SIGNATURE_SIZE = NUM_BANDS * ROWS_PER_BAND
+# Value of a signature slot no shingle hashed into
+EMPTY_SLOT = 0xFFFFFFFF
+# Fixed pseudo-random order in which an empty slot looks for a filled one
+# to copy (densification), the same for every signature
+PROBE_ORDER = [
+    random.Random(slot).sample(range(SIGNATURE_SIZE), SIGNATURE_SIZE)
+    for slot in range(SIGNATURE_SIZE)
+]
+
+
+def minhash(tokens):
+    """One-permutation MinHash signature of the word shingles of a token list
+
+    Each shingle is hashed once; the hash picks a slot and the smallest
+    hash per slot is kept, instead of hashing every shingle `size` times.
+    Slots no shingle hashed into (most of them for short texts) are then
+    densified: they copy the first filled slot in their PROBE_ORDER, so two
+    unrelated short texts do not match on their empty slots, and no LSH
+    band is left empty for all of them to collide in.
+    Returned as an array of 32-bit values to keep millions of them compact.
+    """
+    size = SIGNATURE_SIZE
+    signature = array("I", [EMPTY_SLOT]) * size
+    for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1)):
+        shingle = " ".join(tokens[i : i + SHINGLE_SIZE])
+        value = zlib.crc32(shingle.encode("utf-8"))
+        slot = value % size
+        if value < signature[slot]:
+            signature[slot] = value
+
+    filled = array("I", signature)
+    for slot in range(size):
+        if filled[slot] == EMPTY_SLOT:
+            for other in PROBE_ORDER[slot]:
+                if filled[other] != EMPTY_SLOT:
+                    signature[slot] = filled[other]
+                    break
+    return signature
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """LSH index of MinHash signatures: texts sharing a whole band of the
+    signature land in the same bucket, and only those are compared"""
+
+    def __init__(self, threshold=0.7, min_tokens=30):
+        self.threshold = threshold
+        # Shorter texts (e.g. a bare title) are too small to judge
+        self.min_tokens = min_tokens
+        # Entry id -> key and signature of every indexed text
+        self.keys = []
+        self.signatures = []
+        # hash of (band, band values) -> entry id, or a list of ids once
+        # several entries share the bucket (most buckets hold a single one)
+        self.buckets = {}
+
+    @property
+    def size(self):
+        return len(self.keys)
+
+    def _band_keys(self, signature):
+        for band in range(NUM_BANDS):
+            start = band * ROWS_PER_BAND
+            yield hash((band, *signature[start : start + ROWS_PER_BAND]))
+
+    def signature(self, text):
+        """MinHash signature of a text, or None when it has fewer than min_tokens words"""
+        tokens = TOKEN.findall(text.lower())
+        if len(tokens) < self.min_tokens:
+            return None
+        return minhash(tokens)
+
+    def find(self, signature):
+        """Key of an indexed entry at least `threshold` similar, or None"""
+        compared = set()
+        for bucket_key in self._band_keys(signature):
+            entry = self.buckets.get(bucket_key)
+            if entry is None:
+                continue
+            for entry_id in (entry,) if isinstance(entry, int) else entry:
+                if entry_id in compared:
+                    continue
+                compared.add(entry_id)
+                if similarity(signature, self.signatures[entry_id]) >= self.threshold:
+                    return self.keys[entry_id]
+        return None
+
+    def add(self, key, text):
+        """Index a text unless it nearly duplicates one already indexed
+
+        Returns the key of the earlier near-duplicate, or None when the text
+        was indexed (or is too short to fingerprint).
+        """
+        return self.add_signature(key, self.signature(text))
+
+    def add_signature(self, key, signature):
+        """add() for a signature computed elsewhere, e.g. in a worker process"""
+        if signature is None:
+            return None
+        original = self.find(signature)
+        if original is not None:
+            return original
+        self.insert(key, signature)
+        return None
+
+    def insert(self, key, signature):
+        """Index a signature without checking it against the index"""
+        entry_id = len(self.keys)
+        self.keys.append(key)
+        self.signatures.append(signature)
+        for bucket_key in self._band_keys(signature):
+            entry = self.buckets.get(bucket_key)
+            if entry is None:
+                self.buckets[bucket_key] = entry_id
+            elif isinstance(entry, int):
+                self.buckets[bucket_key] = [entry, entry_id]
+            else:
+                entry.append(entry_id)
+
+
+def content_text(title, description, markdown):
+    """Content that near-duplicates are judged on"""
+    return f"{title} {description} {markdown}"
+
+
+def result_text(result):
+    return content_text(result.title, result.description, result.markdown)
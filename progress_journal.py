@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Append-only progress journal
+Each search result is written as one JSON line so checkpointing costs the
+same whether the run has ten results or a hundred thousand.
+"""
+
+import hashlib
+import json
+import os
+
+# Query outcomes recorded in the journal; only "error" is retried on resume
+QUERY_OK = "ok"
+QUERY_EMPTY = "empty"
+QUERY_ERROR = "error"
+
+
+def query_key(query_obj):
+    """Stable hash of a query object (independent of key order)"""
+    encoded = json.dumps(query_obj, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class ProgressJournal:
+    """JSONL checkpoint that is appended to during a scrape"""
+
+    def __init__(self, filename, sync_every=25):
+        self.filename = filename
+        self.sync_every = max(1, sync_every)
+        self.file = None
+        self.unsynced = 0
+
+    def start(self, results=(), query_statuses=None):
+        """Rewrite the journal with the state already in memory, then open it for appending"""
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(self._encode({"result": result}))
+            for key, status in (query_statuses or {}).items():
+                f.write(self._encode({"query": key, "status": status}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.filename)
+
+        self.file = open(self.filename, "a", encoding="utf-8")
+        self.unsynced = 0
+
+    def append_result(self, result):
+        """Append one result to the journal"""
+        self._write({"result": result})
+
+    def append_query(self, key, status):
+        """Record that a query finished; written after its results"""
+        self._write({"query": key, "status": status})
+
+    def flush(self, sync=False):
+        """Push buffered lines to the OS, fsync when the batch is full or asked to"""
+        if not self.file:
+            return
+        self.file.flush()
+        if sync or self.unsynced >= self.sync_every:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self):
+        """Sync and close the journal"""
+        if not self.file:
+            return
+        self.flush(sync=True)
+        self.file.close()
+        self.file = None
+
+    def _write(self, record):
+        if not self.file:
+            raise RuntimeError("Progress journal is not open, call start() first")
+        self.file.write(self._encode(record))
+        self.unsynced += 1
+
+    def _encode(self, record):
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    @staticmethod
+    def read_records(filename):
+        """Yield the raw records stored in a journal, ignoring a torn last line"""
+        with open(filename, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves at most one partial line
+                    continue
+
+    @staticmethod
+    def read_results(filename):
+        """Yield the results stored in a journal"""
+        for record in ProgressJournal.read_records(filename):
+            if "result" in record:
+                yield record["result"]
+
+    @staticmethod
+    def read_query_statuses(filename):
+        """Return {query_key: status} for every query recorded in a journal"""
+        statuses = {}
+        for record in ProgressJournal.read_records(filename):
+            if "query" in record:
+                statuses[record["query"]] = record["status"]
+        return statuses
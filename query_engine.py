@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Query generation engine
+Expands query templates over configurable dimensions (subreddits, question
+patterns, business terms, time filters), lazily and without near-duplicates,
+and prunes queries that earlier runs showed to return no new URLs.
+"""
+
+import glob
+import re
+from collections import Counter
+from itertools import product
+
+from result_history import iter_all_results, iter_query_yields, split_history
+from scraper_config import ANALYSIS_CONFIG, GENERATOR_CONFIG
+
+TOKEN = re.compile(r"[a-z0-9']+")
+
+# Words that do not change what a search finds
+STOPWORDS = {"a", "an", "the", "i", "my", "to", "with", "for", "of", "in", "on", "do"}
+
+
+def normalize_query(query_text, time_filter=None):
+    """Order- and filler-insensitive form of a query, used to spot near-duplicates"""
+    text, _, site = query_text.lower().partition(" site:")
+    tokens = sorted(set(TOKEN.findall(text)) - STOPWORDS)
+    return " ".join(tokens) + f" |{site.strip()}|{time_filter or ''}"
+
+
+class QueryEngine:
+    """Lazily yields query objects for every combination of the configured dimensions"""
+
+    def __init__(self, config=None, history_files=None):
+        self.config = config or GENERATOR_CONFIG
+        self.seen = set()
+        self.duplicates = 0
+        self.pruned = 0
+
+        if history_files is None and self.config.get("prune_zero_yield"):
+            history_files = sorted(glob.glob(self.config["history_glob"]))
+        self.dead_queries = self._load_dead_queries(history_files or [])
+
+    def _load_dead_queries(self, filenames):
+        """Normalized queries that ran in at least prune_after_runs earlier runs
+        and never produced a new URL in any of them
+
+        One empty run is not enough: a search can come back empty by chance,
+        and a query pruned here is never generated again.
+        """
+        results_files, run_reports = split_history(filenames)
+        min_runs = self.config.get("prune_after_runs", 3)
+        yields = Counter()
+        empty_runs = Counter()
+        # Run reports list every query run, results files the productive ones
+        for filename in run_reports:
+            report_yields = Counter()
+            for query_text, count in iter_query_yields([filename]):
+                report_yields[normalize_query(query_text)] += count
+            for key, count in report_yields.items():
+                yields[key] += count
+                if count == 0:
+                    empty_runs[key] += 1
+        for result in iter_all_results(results_files, ("source_query",)):
+            if result.get("source_query"):
+                yields[normalize_query(result["source_query"])] += 1
+
+        return {
+            key
+            for key, runs in empty_runs.items()
+            if runs >= min_runs and yields[key] == 0
+        }
+
+    def dimensions(self):
+        """The value lists the templates are expanded over"""
+        terms = [None]
+        if self.config.get("use_business_terms"):
+            terms += ANALYSIS_CONFIG["business_terms"]
+        return (
+            self.config["patterns"],
+            terms,
+            self.config["subreddits"],
+            self.config.get("time_filters") or [None],
+        )
+
+    def generate(self):
+        """Yield unique, unpruned query objects one at a time"""
+        for pattern, term, subreddit, time_filter in product(*self.dimensions()):
+            words = f"{pattern} {term}" if term else pattern
+            query_text = f"{words} site:reddit.com/r/{subreddit}"
+
+            key = normalize_query(query_text, time_filter)
+            if key in self.seen:
+                self.duplicates += 1
+                continue
+            self.seen.add(key)
+
+            if normalize_query(query_text) in self.dead_queries:
+                self.pruned += 1
+                continue
+
+            query_obj = {
+                "query": query_text,
+                "type": "business_term_question" if term else "subreddit_question",
+                "subreddit": subreddit,
+                "category": "business_areas" if term else "subreddit_specific",
+                "pattern": pattern,
+            }
+            if term:
+                query_obj["term"] = term
+            if time_filter:
+                query_obj["time_filter"] = time_filter
+            yield query_obj
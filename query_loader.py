@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Streaming query loader
+Yields query objects one at a time from a JSONL file (one query per line) or
+from the {"metadata", "queries"} document written by the query generator,
+without loading the whole table into memory. The same reader streams the
+"results" array of search_results.json documents.
+"""
+
+import json
+
+WHITESPACE = " \t\n\r"
+# Characters that may legally follow a complete value inside a document
+DELIMITERS = WHITESPACE + ",:]}"
+
+
+class _StreamReader:
+    """Pulls JSON values out of a file in chunks with JSONDecoder.raw_decode"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return
+        # Drop what was already consumed so the buffer stays small
+        self.buffer = self.buffer[self.pos :] + data
+        self.pos = 0
+
+    def peek(self):
+        """Next non-whitespace character, or "" at end of file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos : self.pos + 1]
+            self._fill()
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON document, found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        while True:
+            self.peek()
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # A number cut off by the chunk boundary ("12" of "12.5") decodes
+            # fine but is incomplete unless a delimiter follows it
+            if not self.eof and (
+                end == len(self.buffer) or self.buffer[end] not in DELIMITERS
+            ):
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_document_array(f, key, chunk_size=64 * 1024):
+    """Yield the items of the array stored under a top-level key of a JSON
+    object, one at a time; a document without the key yields nothing"""
+    reader = _StreamReader(f, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(":")
+
+        if name == key:
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    separator = reader.peek()
+                    reader.pos += 1
+                    if separator == "]":
+                        break
+                    if separator != ",":
+                        raise ValueError(f"Malformed {key} array in JSON document")
+        else:
+            # metadata and any other top-level values are small; skip them
+            reader.value()
+
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError("Malformed JSON document")
+
+
+def iter_queries(filename, chunk_size=64 * 1024):
+    """Yield query objects from a .jsonl file or a {"metadata", "queries"} document"""
+    with open(filename, "r", encoding="utf-8") as f:
+        if filename.endswith(".jsonl"):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from iter_document_array(f, "queries", chunk_size)
+
+
+def write_queries_jsonl(queries, filename):
+    """Write queries one per line, the format iter_queries streams fastest"""
+    count = 0
+    with open(filename, "w", encoding="utf-8") as f:
+        for query_obj in queries:
+            f.write(json.dumps(query_obj, ensure_ascii=False) + "\n")
+            count += 1
+    return count
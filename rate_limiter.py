@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Rate limiting for search requests
+Token bucket shared by every worker that talks to the search provider, and
+an AIMD controller that tunes the bucket's rate and the number of searches
+in flight from the latency and throttling it observes.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """Thread-safe token bucket (requests per minute with a burst allowance)"""
+
+    def __init__(self, requests_per_minute, burst_size=1):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, int(burst_size))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        # Nobody gets a token before this time (see penalize)
+        self.resume_at = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add the tokens earned since the last update (none while paused)"""
+        earning_since = max(self.updated_at, self.resume_at)
+        if now > earning_since:
+            elapsed = now - earning_since
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self):
+        """Take a token if one is available, without waiting"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self.resume_at and self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        """Block until a token is available, return the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.resume_at:
+                    wait = self.resume_at - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def set_rate(self, requests_per_minute):
+        """Change the refill rate, keeping the tokens earned so far"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = requests_per_minute / 60.0
+
+    def penalize(self, seconds):
+        """Hold back every caller for `seconds`, e.g. after the provider throttled us
+
+        Overlapping penalties do not add up: concurrent 429s asking for the
+        same Retry-After pause the bucket once. After the pause a single
+        request goes through and the rest are paced at the normal rate.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.resume_at = max(self.resume_at, now + seconds)
+            self.tokens = min(self.tokens, 1)
+
+
+class AdaptiveConcurrency:
+    """AIMD controller for searches in flight and the request rate
+
+    Every `limit` finished searches form a window. A window without errors
+    whose mean latency stays under latency_target raises the rate by
+    rpm_step, and the limit by one if the window actually filled it
+    (additive increase); a 429 or a timeout cuts
+    both by decrease_factor (multiplicative decrease). Failures of searches
+    started before the last cut are the same congestion episode and do not
+    cut again, so a burst of 429s from one overload backs off once.
+    """
+
+    def __init__(
+        self,
+        rate_limiter,
+        initial_limit=1,
+        min_limit=1,
+        max_limit=16,
+        min_rpm=1,
+        max_rpm=None,
+        rpm_step=5,
+        latency_target=None,
+        decrease_factor=0.5,
+        history_size=100,
+    ):
+        self.rate_limiter = rate_limiter
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.min_rpm = min_rpm
+        # Never below where the limiter started, so enabling the controller
+        # cannot slow a run down that is not being throttled
+        self.max_rpm = max(max_rpm or 0, rate_limiter.rate * 60)
+        self.rpm_step = rpm_step
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+
+        self.limit = min(self.max_limit, max(self.min_limit, initial_limit))
+        self.rpm = rate_limiter.rate * 60
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        # Current window: searches finished, failed, their total latency and
+        # the most searches that were in flight at once
+        self.window_peak = 0
+        self.window_count = 0
+        self.window_errors = 0
+        self.window_latency = 0.0
+        self.last_decrease = float("-inf")
+        self.increases = 0
+        self.decreases = 0
+        self.throttles = 0
+        self.timeouts = 0
+        self.peak_limit = self.limit
+        self.peak_rpm = self.rpm
+        self.created_at = time.monotonic()
+        # Recent adjustments, for the run report
+        self.history = deque(maxlen=history_size)
+
+    def start(self):
+        """Count a search as in flight, return its start time for record_*()"""
+        with self.lock:
+            self.in_flight += 1
+            self.window_peak = max(self.window_peak, self.in_flight)
+        return time.monotonic()
+
+    def record_success(self, latency):
+        """A search succeeded after `latency` seconds"""
+        with self.lock:
+            self.in_flight -= 1
+            self.window_count += 1
+            self.window_latency += latency
+            self._close_window()
+
+    def record_failure(self, started, throttled=False, timed_out=False):
+        """A search started at `started` (time.monotonic()) failed; throttling
+        and timeouts back off, other errors only keep the current window
+        from raising the limit"""
+        with self.lock:
+            self.in_flight -= 1
+            self.window_count += 1
+            self.window_errors += 1
+            if throttled:
+                self.throttles += 1
+            if timed_out:
+                self.timeouts += 1
+            if (throttled or timed_out) and started > self.last_decrease:
+                self._decrease("throttled" if throttled else "timeout")
+            else:
+                self._close_window()
+
+    def _close_window(self):
+        if self.window_count < self.limit:
+            return
+        mean_latency = self.window_latency / self.window_count
+        healthy = not self.window_errors and (
+            self.latency_target is None or mean_latency <= self.latency_target
+        )
+        saturated = self.window_peak >= self.limit
+        self._reset_window()
+        if not healthy:
+            return
+        limit = self.limit + 1 if saturated else self.limit
+        limit = min(self.max_limit, limit)
+        rpm = min(self.max_rpm, self.rpm + self.rpm_step)
+        if limit != self.limit or rpm != self.rpm:
+            self.limit = limit
+            self._set_rpm(max(self.rpm, rpm))
+            self.increases += 1
+            self.peak_limit = max(self.peak_limit, self.limit)
+            self.peak_rpm = max(self.peak_rpm, self.rpm)
+            self._remember("increase")
+
+    def _decrease(self, reason):
+        self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        self._set_rpm(max(self.min_rpm, self.rpm * self.decrease_factor))
+        self.decreases += 1
+        self.last_decrease = time.monotonic()
+        self._reset_window()
+        self._remember(reason)
+
+    def _reset_window(self):
+        self.window_peak = self.in_flight
+        self.window_count = 0
+        self.window_errors = 0
+        self.window_latency = 0.0
+
+    def _set_rpm(self, rpm):
+        if rpm != self.rpm:
+            self.rpm = rpm
+            self.rate_limiter.set_rate(rpm)
+
+    def _remember(self, event):
+        self.history.append(
+            {
+                "seconds": round(time.monotonic() - self.created_at, 3),
+                "event": event,
+                "limit": self.limit,
+                "requests_per_minute": round(self.rpm, 2),
+            }
+        )
+
+    def state(self):
+        """Current limits and adjustment counts as a JSON-compatible dict"""
+        with self.lock:
+            return {
+                "limit": self.limit,
+                "requests_per_minute": round(self.rpm, 2),
+                "in_flight": self.in_flight,
+                "peak_limit": self.peak_limit,
+                "peak_requests_per_minute": round(self.peak_rpm, 2),
+                "bounds": {
+                    "limit": [self.min_limit, self.max_limit],
+                    "requests_per_minute": [self.min_rpm, round(self.max_rpm, 2)],
+                },
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "throttles": self.throttles,
+                "timeouts": self.timeouts,
+                "history": list(self.history),
+            }
@@ -7,35 +7,215 @@ Loads queries from JSON file and scrapes Reddit to find user insights.
 import json
 import os
 import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from dotenv import load_dotenv
-
-# Only import Firecrawl if we're actually going to use it
-try:
-    from firecrawl import Firecrawl
-
-    FIRECRAWL_AVAILABLE = True
-except ImportError:
-    FIRECRAWL_AVAILABLE = False
-    print("⚠️  Firecrawl not available. Install with: pip install firecrawl-py")
-
-load_dotenv()
+from itertools import chain
+
+from analysis_pool import AnalysisPool
+from insight_analyzer import InsightAnalyzer
+from near_duplicates import NearDuplicateIndex, result_text
+from progress_journal import (
+    QUERY_EMPTY,
+    QUERY_ERROR,
+    QUERY_OK,
+    ProgressJournal,
+    query_key,
+)
+from query_loader import iter_queries
+from rate_limiter import AdaptiveConcurrency, TokenBucket
+from result_aggregator import ResultAggregator
+from result_archive import archive_filename, is_archive, iter_result_dicts, write_archive
+from result_records import (
+    INSIGHT_FIELDS,
+    QueryTable,
+    SearchResult,
+    write_results_document,
+)
+from result_store import ResultStore, content_fingerprint
+from retry_policy import RetryPolicy, classify_error, is_timeout
+from run_metrics import RunMetrics
+from run_planner import RunPlanner
+from scraper_config import (
+    ADAPTIVE_CONFIG,
+    CACHE_CONFIG,
+    OUTPUT_CONFIG,
+    SCRAPING_CONFIG,
+    STORAGE_CONFIG,
+    TRANSPORT_CONFIG,
+)
+from search_backends import (
+    REQUESTS_AVAILABLE,
+    FirecrawlHttpBackend,
+    FirecrawlSdkBackend,
+    document_url,
+    item_field,
+)
+from search_cache import SearchCache
+from seen_url_store import SeenUrlStore
+from url_index import UrlIndex, canonical_url
+
+# Full-page content requested for every search hit
+SCRAPE_OPTIONS = {
+    "formats": ["markdown", "links"],
+    "onlyMainContent": True,
+}
 
 
 class RedditSearchScraper:
     """Scrapes search results using pre-generated queries"""
 
-    def __init__(self, queries_file=None):
+    def __init__(
+        self,
+        queries_file=None,
+        search_backend=None,
+        rate_limiter=None,
+        search_cache=None,
+        metrics_hook=None,
+        api_key=None,
+        base_filename="search_results",
+        result_store=None,
+    ):
+        # SearchResult records; converted to dicts only when saved
         self.search_results = []
+        # One shared QueryRecord per query instead of copied metadata strings
+        self.query_table = QueryTable()
+        # Canonical URLs and summary counters, both kept in sync on append
+        self.url_index = UrlIndex()
+        self.aggregator = ResultAggregator()
+        # Content fingerprints of stored results, for near-duplicate detection
+        self.near_duplicates = None
+        if SCRAPING_CONFIG["near_duplicate_detection"]:
+            self.near_duplicates = NearDuplicateIndex(
+                threshold=SCRAPING_CONFIG["near_duplicate_threshold"],
+                min_tokens=SCRAPING_CONFIG["near_duplicate_min_tokens"],
+            )
         self.queries_file = queries_file
+        # Prefix of the progress journal, dead letters and default results file
+        self.base_filename = base_filename
+        # query_key -> "ok" / "empty" / "error" for queries already run
+        self.query_statuses = {}
+        # Queries that failed for good, kept so they can be replayed
+        self.dead_letters = []
+
+        # Any object with a Firecrawl-compatible search(query, limit, ...) works;
+        # the default Firecrawl client is only built once a search needs it
+        self._search_backend = search_backend
+        self._api_key = api_key
+
+        # Search metadata only and scrape the new URLs in batches, when the
+        # backend can do it (both default backends can); two-phase mode also
+        # skips URLs scraped recently
+        two_phase = SCRAPING_CONFIG["two_phase"]
+        self.batch_scrape = (SCRAPING_CONFIG["batch_scrape"] or two_phase) and (
+            search_backend is None or hasattr(search_backend, "scrape_urls")
+        )
+        self.scrape_batch = []
+        # Hits whose content is still fresh, kept without scraping them again
+        self.fresh_batch = []
+        self.batch_queries = []
+
+        self.seen_store = None
+        if two_phase and self.batch_scrape:
+            self.seen_store = SeenUrlStore(SCRAPING_CONFIG["seen_urls_file"])
+
+        # One bucket for all workers so the provider quota is shared;
+        # delay_between_queries caps the rate further when set
+        requests_per_minute = SCRAPING_CONFIG["requests_per_minute"]
+        if SCRAPING_CONFIG["delay_between_queries"]:
+            requests_per_minute = min(
+                requests_per_minute, 60 / SCRAPING_CONFIG["delay_between_queries"]
+            )
+        self.rate_limiter = rate_limiter or TokenBucket(
+            requests_per_minute, SCRAPING_CONFIG["burst_size"]
+        )
+        # Tunes the bucket's rate and the searches in flight when
+        # ADAPTIVE_CONFIG is enabled; created by the first scrape_and_save
+        self.concurrency_controller = None
+
+        # None builds the cache from CACHE_CONFIG, False disables caching
+        if search_cache is None and CACHE_CONFIG["enabled"]:
+            search_cache = SearchCache(
+                CACHE_CONFIG["filename"],
+                ttl_seconds=CACHE_CONFIG["ttl_seconds"],
+                max_entries=CACHE_CONFIG["max_entries"],
+            )
+        self.search_cache = search_cache or None
+
+        # Indexed SQLite copy of the results, same None/False convention;
+        # incremental mode compares content against it and two-phase mode
+        # carries the stored content of fresh hits forward
+        if result_store is None and (
+            STORAGE_CONFIG["use_result_store"]
+            or SCRAPING_CONFIG["incremental"]
+            or self.seen_store is not None
+        ):
+            result_store = ResultStore(
+                STORAGE_CONFIG["filename"], batch_size=STORAGE_CONFIG["batch_size"]
+            )
+        self.result_store = result_store or None
+        self.incremental = SCRAPING_CONFIG["incremental"] and self.result_store is not None
+
+        if self.seen_store is not None:
+            # Earlier results also go into the result store, so fresh hits
+            # carry their content forward (see _reuse_content)
+            imported = self.seen_store.import_results_files(
+                SCRAPING_CONFIG["history_glob"], self.result_store
+            )
+            print(
+                f"👀 Seen-URL store: {len(self.seen_store)} URLs "
+                f"({imported} results imported from earlier runs)"
+            )
 
-        if FIRECRAWL_AVAILABLE:
-            api_key = os.getenv("FIRECRAWL_API_KEY")
-            if not api_key:
-                raise ValueError("FIRECRAWL_API_KEY not found in environment variables")
-            self.firecrawl = Firecrawl(api_key=api_key)
-        else:
-            self.firecrawl = None
+        self.retry_policy = RetryPolicy(
+            max_retries=SCRAPING_CONFIG["max_retries"],
+            base_delay=SCRAPING_CONFIG["retry_base_delay"],
+            max_delay=SCRAPING_CONFIG["retry_max_delay"],
+        )
+
+        # Timers and counters for the run report; metrics_hook gets every event
+        self.metrics = RunMetrics(self.rate_limiter.rate * 60, hook=metrics_hook)
+
+        # Scores the scraped markdown as results arrive
+        self.insight_analyzer = None
+        if OUTPUT_CONFIG["analyze_insights"]:
+            self.insight_analyzer = InsightAnalyzer(
+                min_intensity=OUTPUT_CONFIG["min_insight_intensity"]
+            )
+
+        # Worker processes for the text analysis, started by scrape_and_save
+        self.analysis_pool = None
+        self.analysis_queue_size = max(1, SCRAPING_CONFIG["analysis_queue_size"])
+
+    @property
+    def search_backend(self):
+        """The search backend, creating the default Firecrawl client on first use"""
+        if self._search_backend is None:
+            # False marks a backend that could not be created, so we warn once
+            self._search_backend = self._create_backend() or False
+        return self._search_backend or None
+
+    def _create_backend(self):
+        """Firecrawl client from FIRECRAWL_API_KEY (imported here, it is slow to load)"""
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        use_http = TRANSPORT_CONFIG["use_http_transport"] and REQUESTS_AVAILABLE
+        if not use_http:
+            try:
+                from firecrawl import Firecrawl
+            except ImportError:
+                print("⚠️  Firecrawl not available. Install with: pip install firecrawl-py")
+                return None
+
+        api_key = self._api_key or os.getenv("FIRECRAWL_API_KEY")
+        if not api_key:
+            raise ValueError("FIRECRAWL_API_KEY not found in environment variables")
+        if use_http:
+            # Pooled keep-alive connections and batch scraping
+            return FirecrawlHttpBackend(api_key)
+        return FirecrawlSdkBackend(Firecrawl(api_key=api_key))
 
     def load_queries_from_json(self, filename):
         """Load queries from JSON file"""
@@ -55,88 +235,628 @@ class RedditSearchScraper:
             print(f"❌ Error loading queries: {str(e)}")
             return []
 
-    def scrape_and_save(self, queries=None, limit_per_query=1, progress_save=True):
-        """Scrape Reddit using queries and save user insights"""
-        if not self.firecrawl:
+    def iter_queries_from_json(self, filename):
+        """Stream queries from a JSON or JSONL query file one at a time"""
+        count = 0
+        try:
+            for query_obj in iter_queries(filename):
+                count += 1
+                yield query_obj
+            print(f"📂 Streamed {count} queries from {filename}")
+
+        except FileNotFoundError:
+            print(f"❌ Query file {filename} not found.")
+        except Exception as e:
+            print(f"❌ Error loading queries after {count} queries: {str(e)}")
+
+    def plan_queries(self, queries, history_files=None):
+        """Filter, prioritize and cap queries according to SCRAPING_CONFIG (lazily)"""
+        return RunPlanner(SCRAPING_CONFIG, history_files=history_files).plan(queries)
+
+    def scrape_and_save(
+        self, queries=None, limit_per_query=None, progress_save=None, concurrency=None
+    ):
+        """Scrape Reddit using queries (any iterable) and save user insights"""
+        if not self.search_backend:
             print("❌ Cannot scrape without Firecrawl. Please install firecrawl-py")
             return []
 
         if not queries:
             if self.queries_file:
-                queries = self.load_queries_from_json(self.queries_file)
+                queries = self.plan_queries(
+                    self.iter_queries_from_json(self.queries_file)
+                )
             else:
                 print("❌ No queries provided and no queries file specified")
                 return []
 
-        base_filename = "search_results"
+        if limit_per_query is None:
+            limit_per_query = SCRAPING_CONFIG["limit_per_query"]
+        if progress_save is None:
+            progress_save = SCRAPING_CONFIG["save_progress"]
+        if concurrency is None:
+            concurrency = SCRAPING_CONFIG["concurrent_searches"]
+        concurrency = max(1, concurrency)
+        # Later runs (e.g. dead-letter replays) keep the limits learned so far
+        if ADAPTIVE_CONFIG["enabled"] and self.concurrency_controller is None:
+            self.concurrency_controller = AdaptiveConcurrency(
+                self.rate_limiter,
+                initial_limit=concurrency,
+                min_limit=ADAPTIVE_CONFIG["min_concurrency"],
+                max_limit=ADAPTIVE_CONFIG["max_concurrency"],
+                min_rpm=ADAPTIVE_CONFIG["min_requests_per_minute"],
+                max_rpm=ADAPTIVE_CONFIG["max_requests_per_minute"],
+                rpm_step=ADAPTIVE_CONFIG["rpm_step"],
+                latency_target=ADAPTIVE_CONFIG["latency_target_seconds"],
+                decrease_factor=ADAPTIVE_CONFIG["decrease_factor"],
+            )
+            self.metrics.concurrency = self.concurrency_controller
 
-        print(f"🚀 Starting to scrape {len(queries)} queries...")
+        base_filename = self.base_filename
 
-        for i, query_obj in enumerate(queries):
-            query_text = query_obj["query"]
-            print(f"Discovery search {i + 1}/{len(queries)}: {query_text}")
+        # Skip queries a previous (resumed) session already completed
+        if self.query_statuses:
+            queries = (
+                q
+                for q in queries
+                if self.query_statuses.get(query_key(q)) not in (QUERY_OK, QUERY_EMPTY)
+            )
 
-            try:
-                # Search with Firecrawl
-                results = self.firecrawl.search(
-                    query=query_text,
-                    limit=limit_per_query,
-                    scrape_options={
-                        "formats": ["markdown", "links"],
-                        "onlyMainContent": True,
-                    },
-                    timeout=30000,
-                )
+        count = f"{len(queries)} " if hasattr(queries, "__len__") else ""
+        controller = self.concurrency_controller
+        in_flight = (
+            f"adaptive, starting at {controller.limit}" if controller else concurrency
+        )
+        print(
+            f"🚀 Starting to scrape {count}queries "
+            f"({in_flight} in flight, {self.rate_limiter.rate * 60:g} searches/minute)..."
+        )
+
+        # Results are appended to a JSONL journal; the full JSON document is
+        # only written once by save_results at the end of the run
+        journal = None
+        if progress_save:
+            journal = ProgressJournal(
+                f"{base_filename}_progress.jsonl",
+                sync_every=SCRAPING_CONFIG["journal_sync_every"],
+            )
+            journal.start(
+                (result.to_dict() for result in self.search_results),
+                self.query_statuses,
+            )
 
-                # Process search results with full query metadata
-                self.process_search_results(results, query_obj)
+        self.metrics.start()
+        self.analysis_pool = self._start_analysis_pool()
+        try:
+            self._run_queries(queries, limit_per_query, concurrency, journal)
+        finally:
+            if self.analysis_pool:
+                self.analysis_pool.close()
+                self.analysis_pool = None
+            if journal:
+                journal.close()
+            if self.result_store:
+                self.result_store.flush()
+            self.metrics.finish()
+
+        if progress_save and self.dead_letters:
+            self.save_dead_letters(f"{base_filename}_dead_letters.json")
 
-                # Save progress after each search
-                if progress_save and self.search_results:
-                    progress_filename = f"{base_filename}_progress.json"
-                    self.save_results(progress_filename)
+        return self.search_results
 
-                # Rate limiting: 5 searches per minute = 12 seconds between searches
-                print(f"⏳ Waiting 12 seconds for rate limiting (5 searches/minute)...")
-                time.sleep(15)
+    def _start_analysis_pool(self):
+        """AnalysisPool per SCRAPING_CONFIG["analysis_workers"], or None"""
+        workers = SCRAPING_CONFIG["analysis_workers"]
+        if workers == 0 or not (self.insight_analyzer or self.near_duplicates):
+            return None
+        pool = AnalysisPool(
+            workers,
+            analyze=self.insight_analyzer is not None,
+            min_tokens=self.near_duplicates.min_tokens if self.near_duplicates else None,
+        )
+        print(f"🧠 Analyzing results in {pool.workers} worker processes")
+        return pool
+
+    def _run_queries(self, queries, limit_per_query, concurrency, journal):
+        """Keep up to `concurrency` searches in flight (or as many as the
+        adaptive controller allows) and process them as they finish"""
+        controller = self.concurrency_controller
+        max_workers = controller.max_limit if controller else concurrency
+
+        # Workers only run the searches; results are processed and saved here
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            # Analysis pool futures -> (query, results waiting for their analysis)
+            analyzing = {}
+            query_iter = iter(enumerate(queries))
+
+            while True:
+                # Backpressure: hold new searches while the analysis queue is full
+                limit = controller.limit if controller else concurrency
+                while len(pending) < limit and len(analyzing) < self.analysis_queue_size:
+                    next_query = next(query_iter, None)
+                    if next_query is None:
+                        break
+                    i, query_obj = next_query
+                    print(f"Discovery search {i + 1}: {query_obj['query']}")
+                    future = executor.submit(self.run_search, query_obj, limit_per_query)
+                    pending[future] = query_obj
+
+                if not pending and not analyzing:
+                    break
+
+                done, _ = wait(
+                    list(pending) + list(analyzing), return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    if future in analyzing:
+                        query_obj, candidates = analyzing.pop(future)
+                        self._finish_analysis(journal, query_obj, candidates, future)
+                        continue
+
+                    query_obj = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        print(f"Error searching '{query_obj['query']}': {str(e)}")
+                        self._add_dead_letter(query_obj, e)
+                        self._record_query(journal, query_obj, QUERY_ERROR, 0)
+                        continue
+
+                    if self.analysis_pool and not self.batch_scrape:
+                        # Only extraction happens here; the pool analyzes and
+                        # the results are stored once its future completes
+                        with self.metrics.phase("process"):
+                            candidates = list(self._new_results(results, query_obj))
+                        future = self._submit_analysis(candidates) if candidates else None
+                        if future is not None:
+                            analyzing[future] = (query_obj, candidates)
+                            continue
+                        # Nothing new, or the pool just broke: finish it here
+                        with self.metrics.phase("process"):
+                            new_results = self._accept_results(candidates)
+                        self._checkpoint_query(journal, query_obj, new_results)
+                        continue
+
+                    # Process search results with full query metadata
+                    with self.metrics.phase("process"):
+                        new_results = self.process_search_results(results, query_obj)
+
+                    if self.batch_scrape:
+                        # The query is checkpointed once its batch is scraped
+                        self.batch_queries.append(query_obj)
+                        if len(self.scrape_batch) >= SCRAPING_CONFIG["scrape_batch_size"]:
+                            self._flush_scrape_batch(journal)
+                        continue
+
+                    self._checkpoint_query(journal, query_obj, new_results)
+
+        if self.batch_queries:
+            self._flush_scrape_batch(journal)
+
+    def _submit_analysis(self, candidates):
+        """Future of the pool's analysis of candidates, None if the pool broke"""
+        try:
+            return self.analysis_pool.submit(candidates)
+        except BrokenProcessPool as e:
+            self._drop_analysis_pool(e)
+            return None
+
+    def _drop_analysis_pool(self, error):
+        """Stop using a pool whose worker died; results are analyzed here from now on"""
+        if self.analysis_pool is None:
+            return
+        print(f"⚠️  Analysis pool broke, analyzing locally from now on: {str(error)}")
+        self.analysis_pool.close()
+        self.analysis_pool = None
 
+    def _finish_analysis(self, journal, query_obj, candidates, future):
+        """Store and checkpoint a query's results once the pool analyzed them"""
+        try:
+            analyses = future.result()
+        except BrokenProcessPool as e:
+            # A broken pool must not lose results; analyze them here instead
+            self._drop_analysis_pool(e)
+            analyses = None
+        except Exception as e:
+            print(f"⚠️  Analysis failed, analyzing locally: {str(e)}")
+            analyses = None
+        with self.metrics.phase("process"):
+            new_results = self._accept_results(candidates, analyses)
+        self._checkpoint_query(journal, query_obj, new_results)
+
+    def _checkpoint_query(self, journal, query_obj, new_results):
+        """Checkpoint the new results of a search, then the search itself"""
+        with self.metrics.phase("checkpoint"):
+            self._checkpoint_results(journal, new_results)
+            status = QUERY_OK if new_results else QUERY_EMPTY
+            self._record_query(journal, query_obj, status, len(new_results))
+        print(f"  {self.aggregator.progress_line()}")
+
+    def _flush_scrape_batch(self, journal):
+        """Scrape the queued URLs in one batch, then store and checkpoint them
+        along with the fresh hits kept without scraping"""
+        batch, self.scrape_batch = self.scrape_batch, []
+        fresh, self.fresh_batch = self.fresh_batch, []
+        queries, self.batch_queries = self.batch_queries, []
+
+        if batch:
+            urls = [result.url for result in batch]
+            print(f"📦 Batch scraping {len(urls)} URLs...")
+            try:
+                pages = self.retry_policy.call(
+                    lambda: self._scrape_urls(urls),
+                    on_throttle=self.rate_limiter.penalize,
+                )
             except Exception as e:
-                print(f"Error searching '{query_text}': {str(e)}")
-                continue
+                print(f"Error batch scraping {len(urls)} URLs: {str(e)}")
+                queries, fresh = self._fail_scrape_batch(journal, batch, fresh, queries, e)
+                batch = []
+            else:
+                for result in batch:
+                    result.markdown = pages.get(canonical_url(result.url), "")
+                if self.seen_store is not None:
+                    scraped = [result.url for result in batch if result.markdown]
+                    self.seen_store.mark_scraped(scraped, time.time())
+
+        analyses = None
+        if self.analysis_pool and batch:
+            with self.metrics.phase("analysis"):
+                try:
+                    analyses = self.analysis_pool.analyze(batch)
+                except BrokenProcessPool as e:
+                    self._drop_analysis_pool(e)
+        with self.metrics.phase("process"):
+            added = self._accept_results(batch, analyses)
+            # Fresh hits already carry their insight fields (see _reuse_content)
+            added += self._accept_results(fresh, analyze=False)
+
+        with self.metrics.phase("checkpoint"):
+            self._checkpoint_results(journal, added)
+            added_per_query = Counter(id(result.query) for result in added)
+            for query_obj in queries:
+                count = added_per_query[id(self.query_table.get(query_obj))]
+                status = QUERY_OK if count else QUERY_EMPTY
+                self._record_query(journal, query_obj, status, count)
+        print(f"  {self.aggregator.progress_line()}")
+
+    def _fail_scrape_batch(self, journal, batch, fresh, queries, error):
+        """Dead-letter the queries whose results could not be scraped, and
+        return the other queries and fresh hits of the batch
+
+        Without content their results would mostly fall below the intensity
+        threshold and the queries would look empty, so resume would skip them
+        and their zero yield would get them pruned. Instead they fail like a
+        search, and their URLs leave the index so a replay finds them again.
+        """
+        failed = {id(result.query) for result in batch}
+        lost = batch + [result for result in fresh if id(result.query) in failed]
+        for result in lost:
+            self.url_index.discard(result.url)
+
+        remaining = []
+        with self.metrics.phase("checkpoint"):
+            for query_obj in queries:
+                if id(self.query_table.get(query_obj)) in failed:
+                    self._add_dead_letter(query_obj, error)
+                    self._record_query(journal, query_obj, QUERY_ERROR, 0)
+                else:
+                    remaining.append(query_obj)
+        return remaining, [result for result in fresh if id(result.query) not in failed]
+
+    def _reuse_content(self, result):
+        """Fill a hit whose content is still fresh from its stored copy
+
+        Without a stored copy it keeps the metadata of the search, analyzed
+        as is. Either way only the scrape is skipped: the hit stays in this
+        run's output rather than vanishing from the results file.
+        """
+        stored = self.result_store.get(result.url) if self.result_store else None
+        if stored is not None:
+            result.markdown = stored.markdown
+            for field in INSIGHT_FIELDS:
+                setattr(result, field, getattr(stored, field))
+        elif self.insight_analyzer:
+            self.insight_analyzer.analyze_result(result)
+
+    def _scrape_urls(self, urls):
+        """One batch scrape request, paced by the shared rate limiter"""
+        waited = self.rate_limiter.acquire()
+        self.metrics.add_time("rate_limit_wait", waited)
+        self.metrics.increment("batch_scrapes")
+        with self.metrics.phase("batch_scrape"):
+            return self.search_backend.scrape_urls(urls, SCRAPE_OPTIONS)
+
+    def _checkpoint_results(self, journal, results):
+        """Append new results to the journal and queue them for the result store"""
+        for result in results:
+            if journal:
+                journal.append_result(result.to_dict())
+            if self.result_store:
+                self.result_store.add(result)
+
+    def _record_query(self, journal, query_obj, status, result_count):
+        """Remember a query's outcome and checkpoint it after its results"""
+        key = query_key(query_obj)
+        self.query_statuses[key] = status
+        if journal:
+            journal.append_query(key, status)
+            journal.flush()
+        self.metrics.record_query(query_obj["query"], status, result_count)
+
+    def _add_dead_letter(self, query_obj, error):
+        """Keep a failed query and why it failed"""
+        cause = getattr(error, "error", error)
+        self.metrics.record_error(query_obj["query"], cause)
+        self.dead_letters.append(
+            {
+                "query": query_obj,
+                "error": str(cause),
+                "error_type": type(cause).__name__,
+                "attempts": getattr(error, "attempts", 1),
+                "retryable": getattr(error, "retryable", False),
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
+
+    def save_dead_letters(self, filename):
+        """Save failed queries so they can be replayed later"""
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(
+                {"total_failed": len(self.dead_letters), "failed": self.dead_letters},
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+        print(f"☠️  Saved {len(self.dead_letters)} failed queries to {filename}")
+        return filename
 
-        return self.search_results
+    def load_dead_letters(self, filename):
+        """Load failed queries saved by a previous session"""
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                self.dead_letters.extend(json.load(f).get("failed", []))
+            print(f"📂 Loaded {len(self.dead_letters)} failed queries from {filename}")
+            return True
+        except FileNotFoundError:
+            print(f"⚠️  Dead-letter file {filename} not found.")
+            return False
+
+    def replay_dead_letters(self, limit_per_query=None, progress_save=None):
+        """Run the failed queries again; the ones that fail again are re-queued"""
+        queries = [entry["query"] for entry in self.dead_letters]
+        self.dead_letters = []
+        if not queries:
+            print("✅ No failed queries to replay.")
+            return self.search_results
+        print(f"🔁 Replaying {len(queries)} failed queries...")
+        return self.scrape_and_save(
+            queries=queries, limit_per_query=limit_per_query, progress_save=progress_save
+        )
+
+    def run_search(self, query_obj, limit_per_query):
+        """Run one search, from the cache or once the shared rate limiter allows it"""
+        query_text = query_obj["query"]
+        # Optional time filter (e.g. "qdr:w") set by the query generator
+        tbs = query_obj.get("time_filter")
+        search_options = {"tbs": tbs} if tbs else {}
+        # In batch mode the search only returns url, title and description
+        scrape_options = None if self.batch_scrape else SCRAPE_OPTIONS
+
+        # Cache hits cost neither a network round trip nor a rate-limit token
+        if self.search_cache:
+            with self.metrics.phase("cache_lookup"):
+                cached = self.search_cache.get(
+                    query_text, limit_per_query, scrape_options, tbs=tbs
+                )
+            if cached is not None:
+                print(f"  💾 Cache hit: {query_text}")
+                self.metrics.increment("cache_hits")
+                return cached
+
+        def search_once():
+            # Every attempt, retries included, takes a token from the shared bucket
+            waited = self.rate_limiter.acquire()
+            self.metrics.add_time("rate_limit_wait", waited)
+            if waited >= 1:
+                print(f"⏳ Waited {waited:.1f}s for rate limiting...")
+
+            self.metrics.increment("searches")
+            controller = self.concurrency_controller
+            started = controller.start() if controller else time.monotonic()
+            try:
+                with self.metrics.phase("search"):
+                    results = self.search_backend.search(
+                        query=query_text,
+                        limit=limit_per_query,
+                        scrape_options=scrape_options,
+                        timeout=TRANSPORT_CONFIG["search_timeout_ms"],
+                        **search_options,
+                    )
+            except Exception as e:
+                # 429s and timeouts make the controller back off
+                if controller:
+                    controller.record_failure(
+                        started, throttled=classify_error(e)[1], timed_out=is_timeout(e)
+                    )
+                raise
+            if controller:
+                controller.record_success(time.monotonic() - started)
+            return results
+
+        def on_retry(attempt, error, delay):
+            self.metrics.record_retry()
+            print(
+                f"🔁 Retry {attempt}/{self.retry_policy.max_retries} for "
+                f"'{query_text}' in {delay:.1f}s: {str(error)}"
+            )
+
+        # Throttling pauses the shared bucket so every worker slows down
+        results = self.retry_policy.call(
+            search_once, on_retry=on_retry, on_throttle=self.rate_limiter.penalize
+        )
+
+        if self.search_cache:
+            self.search_cache.put(
+                query_text, limit_per_query, scrape_options, results, tbs=tbs
+            )
+        return results
 
     def extract_url_title_description(self, searchdata):
-        """Extract URL, title, and description from search results"""
+        """Extract URL, title, description and scraped markdown from search results"""
         web_results = getattr(searchdata, "web", None)
         if not web_results:
             return []
         extracted = []
         for item in web_results:
-            url = getattr(item, "url", "")
-            title = getattr(item, "title", "")
-            description = getattr(item, "description", "")
-            extracted.append({"url": url, "title": title, "description": description})
+            # Scraped hits come back as documents with url/title in metadata
+            metadata = getattr(item, "metadata", None) or {}
+            url = getattr(item, "url", None) or document_url(item)
+            title = getattr(item, "title", None) or item_field(metadata, "title", "")
+            description = getattr(item, "description", None) or item_field(
+                metadata, "description", ""
+            )
+            markdown = getattr(item, "markdown", None) or ""
+            extracted.append(SearchResult(url, title, description, markdown))
         return extracted
 
+    def _drop_duplicates(self, results):
+        """Yield only results whose URL is not indexed yet (in any equivalent form)"""
+        for result in results:
+            if not self.url_index.add(result.url):
+                print(f"  ↩️  Duplicate skipped: {result.url}")
+                continue
+            yield result
+
+    def _new_results(self, results, query_obj):
+        """Lazily extract results not seen yet and link them to their query"""
+        query_record = self.query_table.get(query_obj)
+        return self._link_query(
+            self._drop_duplicates(self.extract_url_title_description(results)),
+            query_record,
+        )
+
     def process_search_results(self, results, query_obj):
-        """Save raw search results to JSON"""
+        """Attach query metadata to search results and return the ones added"""
         if not results:
+            return []
+
+        # Lazy pipeline: extract -> dedupe -> link query -> analyze -> store
+        stream = self._new_results(results, query_obj)
+
+        if self.batch_scrape:
+            # Content arrives later from _flush_scrape_batch
+            max_age = SCRAPING_CONFIG["content_max_age_days"] * 86400
+            now = time.time()
+            for result in stream:
+                seen_store = self.seen_store
+                if seen_store is not None and seen_store.is_fresh(result.url, max_age, now):
+                    print(f"  ⏭️  Content still fresh, not scraping: {result.url}")
+                    self.metrics.increment("scrapes_skipped")
+                    self._reuse_content(result)
+                    self.fresh_batch.append(result)
+                    continue
+                self.scrape_batch.append(result)
+            return []
+
+        return self._accept_results(stream)
+
+    def _link_query(self, results, query_record):
+        """Point each result at the shared record of the query that found it"""
+        for result in results:
+            result.query = query_record
+            yield result
+
+    def _drop_near_duplicates(self, results, signatures):
+        """Yield only results whose content does not nearly duplicate a kept one
+
+        signatures maps result URLs (unique after _drop_duplicates) to their
+        signature, computed here unless the analysis pool already did.
+        Results are only indexed once they are kept (see _index_content), so
+        a copy of a result that a later filter drops is not rejected for it.
+        """
+        for result in results:
+            if result.url not in signatures:
+                signatures[result.url] = self.near_duplicates.signature(
+                    result_text(result)
+                )
+            signature = signatures[result.url]
+            original = self.near_duplicates.find(signature) if signature else None
+            if original is not None:
+                print(f"  ♊ Near-duplicate of {original} skipped: {result.url}")
+                self.metrics.increment("near_duplicates")
+                continue
+            yield result
+
+    def _index_content(self, result, signatures):
+        """Add a kept (or already stored) result to the near-duplicate index"""
+        if self.near_duplicates is None:
             return
+        signature = signatures.pop(result.url, None)
+        if signature is not None:
+            self.near_duplicates.insert(result.url, signature)
 
-        extracted_results = self.extract_url_title_description(results)
+    def _drop_unchanged(self, results, signatures):
+        """Yield only results whose content differs from the stored copy"""
+        for result in results:
+            stored = self.result_store.fingerprint(result.url)
+            if stored is None:
+                self.metrics.increment("results_new")
+            elif stored == (content_fingerprint(result.markdown) or ""):
+                print(f"  💤 Unchanged since last run: {result.url}")
+                self.metrics.increment("results_unchanged")
+                # Still stored, so later copies remain near-duplicates of it
+                self._index_content(result, signatures)
+                continue
+            else:
+                self.metrics.increment("results_changed")
+            yield result
+
+    def _accept_results(self, results, analyses=None, analyze=True):
+        """Analyze (and filter) results, then timestamp and store them
+
+        analyses holds the (insight, signature) pair of every result when the
+        analysis pool already did the text work. With analyze=False the
+        insight fields are taken as set and nothing is filtered on them.
+        """
+        signatures = {}
+        if analyses is not None:
+            for result, (insight, signature) in zip(results, analyses):
+                if insight is not None:
+                    InsightAnalyzer.apply(result, insight)
+                signatures[result.url] = signature
+
+        stream = iter(results)
+        if self.near_duplicates is not None:
+            # Runs here rather than at extraction so batch-scraped content counts
+            stream = self._drop_near_duplicates(stream, signatures)
+        if self.incremental:
+            # Unchanged pages are already analyzed and stored
+            stream = self._drop_unchanged(stream, signatures)
+        if self.insight_analyzer and analyze:
+            if analyses is None:
+                stream = self.insight_analyzer.analyze_stream(stream)
+            else:
+                stream = self.insight_analyzer.filter_stream(stream)
 
-        for result in extracted_results:
-            # Add the original query and platform to the result
-            result["source_query"] = query_obj["query"]
-            result["query_type"] = query_obj["type"]
-            result["subreddit"] = query_obj["subreddit"]
-            result["category"] = query_obj["category"]
-            result["timestamp"] = datetime.now().isoformat()
-            result["platform"] = self.get_platform(result.get("url", ""))
+        added = []
+        for result in stream:
+            result.timestamp = time.time()
+            result.platform = self.get_platform(result.url)
 
-            self.search_results.append(result)
-            print(f"  ✅ Saved result: {result['title'][:60]}...")
+            self.add_result(result)
+            self._index_content(result, signatures)
+            added.append(result)
+            print(f"  ✅ Saved result: {result.title[:60]}...")
+
+        # Results that passed every filter, whatever the mode
+        self.metrics.increment("results_added", len(added))
+        return added
+
+    def add_result(self, result):
+        """Append a result that already passed the URL index and count it"""
+        self.search_results.append(result)
+        self.aggregator.add(result)
 
     def get_platform(self, url):
         """Determine the platform from URL"""
@@ -152,59 +872,91 @@ class RedditSearchScraper:
     def save_results(self, filename=None):
         """Save search results to JSON file"""
         if not filename:
-            filename = "search_results.json"
-
-        # Remove duplicates based on URL
-        unique_results = []
-        seen_urls = set()
-
-        for result in self.search_results:
-            if result["url"] not in seen_urls:
-                unique_results.append(result)
-                seen_urls.add(result["url"])
+            filename = f"{self.base_filename}.json"
+
+        # search_results is deduplicated on insert by url_index
+        unique_results = self.search_results
+        stem = os.path.splitext(filename)[0]
+
+        if self.incremental:
+            # This run only kept new and changed pages: they form the delta,
+            # while the results file is the full store
+            delta_filename = f"{stem}_delta.json"
+            with open(delta_filename, "w", encoding="utf-8") as f:
+                write_results_document(f, unique_results, datetime.now().isoformat())
+            print(
+                f"🆕 Saved {len(unique_results)} new or changed results "
+                f"to {delta_filename}"
+            )
+            total = self.result_store.export_json(filename)
+            print(f"💾 Exported {total} stored results to {filename}")
+        else:
+            # Save to file, serializing one record at a time
+            with open(filename, "w", encoding="utf-8") as f:
+                write_results_document(f, unique_results, datetime.now().isoformat())
+            print(f"💾 Saved {len(unique_results)} unique search results to {filename}")
+
+        compression = STORAGE_CONFIG["archive_compression"]
+        if compression:
+            # Compact copy of the results file for the result history, which
+            # in incremental mode is the full store rather than this run's delta
+            archive = archive_filename(filename, compression)
+            archived = write_archive(
+                archive,
+                self.result_store.iter_results() if self.incremental else unique_results,
+            )
+            print(f"🗜️  Archived {archived} results to {archive}")
 
-        # Save to file
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "total_results": len(unique_results),
-                    "timestamp": datetime.now().isoformat(),
-                    "results": unique_results,
-                },
-                f,
-                indent=2,
-                ensure_ascii=False,
+        if self.result_store:
+            self.result_store.flush()
+            print(
+                f"🗄️  Result store {self.result_store.filename}: "
+                f"{self.result_store.count()} results"
             )
 
-        print(f"💾 Saved {len(unique_results)} unique search results to {filename}")
+        # Machine-readable run report next to the results file
+        if self.metrics.started_at:
+            report_filename = f"{stem}_run_report.json"
+            self.metrics.write_report(report_filename)
+            print(f"📊 Run report saved to {report_filename}")
+
         return filename
 
-    def generate_summary(self, results):
+    def generate_summary(self, results=None):
         """Generate a simple summary of the search results"""
-        summary = {"platforms": {}, "total_results": len(results)}
-
-        for result in results:
-            # Count platforms
-            platform = result.get("platform", "other")
-            summary["platforms"][platform] = summary["platforms"].get(platform, 0) + 1
-
-        return summary
+        # The live aggregator already covers this session's results
+        if results is None or results is self.search_results:
+            return self.aggregator.summary()
+        return ResultAggregator(results).summary()
 
     def load_existing_progress(self, filename):
         """Load existing progress from a previous session"""
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                existing_insights = data.get("results", [])
-
-            # Add existing results to current session
-            for result in existing_insights:
-                if result not in self.search_results:
-                    self.search_results.append(result)
+            if is_archive(filename):
+                existing_insights = list(iter_result_dicts(filename))
+            elif filename.endswith(".jsonl"):
+                existing_insights = list(ProgressJournal.read_results(filename))
+                self.query_statuses.update(
+                    ProgressJournal.read_query_statuses(filename)
+                )
+            else:
+                with open(filename, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                    existing_insights = data.get("results", [])
+
+            # Add existing results to current session, skipping known URLs
+            for data in existing_insights:
+                if self.url_index.add(data.get("url", "")):
+                    result = SearchResult.from_dict(data, self.query_table)
+                    if self.near_duplicates is not None:
+                        self.near_duplicates.add(result.url, result_text(result))
+                    self.add_result(result)
 
             print(
                 f"📂 Loaded {len(existing_insights)} existing results from {filename}"
             )
+            if self.query_statuses:
+                print(f"📂 {len(self.query_statuses)} queries already recorded")
             return True
 
         except FileNotFoundError:
@@ -222,99 +974,117 @@ class RedditSearchScraper:
 
         print("\n📊 SEARCH RESULTS SUMMARY:")
         print(f"Total results found: {len(self.search_results)}")
+        if self.search_cache:
+            print(
+                f"Search cache: {self.search_cache.hits} hits, "
+                f"{self.search_cache.misses} misses"
+            )
 
-        # Group by platform
-        platforms = {}
-        for result in self.search_results:
-            platform = result.get("platform", "other")
-            platforms[platform] = platforms.get(platform, 0) + 1
+        aggregator = self.aggregator
 
         print("\n📈 By platform:")
-        for platform, count in platforms.items():
+        for platform, count in aggregator.platforms.items():
             print(f"  {platform}: {count}")
 
-        # Group by query type
-        query_types = {}
-        for result in self.search_results:
-            query_type = result.get("query_type", "other")
-            query_types[query_type] = query_types.get(query_type, 0) + 1
-
         print("\n📊 By query type:")
-        for query_type, count in query_types.items():
+        for query_type, count in aggregator.query_types.items():
             print(f"  {query_type}: {count}")
 
-        # Group by subreddit
-        subreddits = {}
-        for result in self.search_results:
-            subreddit = result.get("subreddit", "other")
-            subreddits[subreddit] = subreddits.get(subreddit, 0) + 1
-
         print("\n🏷️  By subreddit:")
-        for subreddit, count in subreddits.items():
+        for subreddit, count in aggregator.subreddits.items():
             print(f"  r/{subreddit}: {count}")
 
-        # Group by category
-        categories = {}
-        for result in self.search_results:
-            category = result.get("category", "other")
-            categories[category] = categories.get(category, 0) + 1
-
         print("\n📂 By category:")
-        for category, count in categories.items():
+        for category, count in aggregator.categories.items():
             print(f"  {category}: {count}")
 
+        print("\n🌐 Top domains:")
+        for domain, count in aggregator.domains.most_common(5):
+            print(f"  {domain}: {count}")
+
         print("\n🔝 Top 5 results:")
         for i, result in enumerate(self.search_results[:5]):
-            print(f"  {i + 1}. {result['title'][:80]}...")
-            print(f"     URL: {result['url']}")
-            print(f"     Query: {result.get('source_query', 'N/A')}")
-            print(f"     Type: {result.get('query_type', 'N/A')}")
-            print(f"     Subreddit: {result.get('subreddit', 'N/A')}")
-            print(f"     Category: {result.get('category', 'N/A')}")
+            query = result.query
+            print(f"  {i + 1}. {result.title[:80]}...")
+            print(f"     URL: {result.url}")
+            print(f"     Query: {query.query if query else 'N/A'}")
+            print(f"     Type: {query.type if query else 'N/A'}")
+            print(f"     Subreddit: {query.subreddit if query else 'N/A'}")
+            print(f"     Category: {query.category if query else 'N/A'}")
             print()
 
 
-def main():
-    """Main execution function for scraping"""
+def main(query_file="discovery_queries.json", resume=False):
+    """Main execution function for scraping
+
+    With resume, continue the interrupted run recorded in the progress
+    journal. Otherwise start from scratch, moving an existing journal aside
+    so the new run does not overwrite it.
+    """
     print("🚀 Starting Reddit Search Scraper...")
 
     # Check if queries file exists
-    query_file = "discovery_queries.json"
-
     if not os.path.exists(query_file):
-        print("❌ Query file not found. Please run query_generator.py first.")
+        print("❌ Query file not found. Please run simple_query_generator.py first.")
         return
 
     print(f"📂 Using query file: {query_file}")
 
+    progress_file = "search_results_progress.jsonl"
+    if resume and not os.path.exists(progress_file):
+        print(f"❌ No interrupted run to resume ({progress_file} not found).")
+        return
+    if not resume and os.path.exists(progress_file):
+        stamp = datetime.fromtimestamp(os.path.getmtime(progress_file))
+        rotated = f"search_results_progress_{stamp:%Y%m%d_%H%M%S}.jsonl"
+        os.replace(progress_file, rotated)
+        print(f"↪️  Moved the interrupted run's journal to {rotated} (resume to continue it)")
+
     # Create scraper instance
     scraper = RedditSearchScraper(query_file)
 
-    # Load and display query info
-    queries = scraper.load_queries_from_json(query_file)
-    if not queries:
+    # Resume an interrupted run from its progress journal
+    if resume:
+        scraper.load_existing_progress(progress_file)
+
+    # Stream queries so scraping starts before the whole table is read
+    queries = scraper.iter_queries_from_json(query_file)
+    first = next(queries, None)
+    if first is None:
         print("❌ No queries loaded. Exiting.")
         return
 
-    print(f"📊 Loaded {len(queries)} queries")
     print(
-        f"Sample query: {queries[0]['query']} (Type: {queries[0]['type']}, Subreddit: {queries[0]['subreddit']})"
+        f"Sample query: {first['query']} (Type: {first['type']}, Subreddit: {first['subreddit']})"
     )
 
-    # Start scraping
-    results = scraper.scrape_and_save(limit_per_query=5)
+    # Start scraping (filters, priorities and limits come from SCRAPING_CONFIG)
+    results = scraper.scrape_and_save(
+        queries=scraper.plan_queries(chain([first], queries))
+    )
 
     # Display summary
     scraper.display_summary()
 
-    # Save final results
-    if results:
+    # Save final results (an incremental run with no changes still
+    # refreshes the results file and writes an empty delta)
+    if results or scraper.incremental:
         final_filename = scraper.save_results()
         print("\n✅ Scraping completed!")
         print(f"📁 Final results saved to: {final_filename}")
+
+        # The run finished, so the next one should start from scratch
+        if os.path.exists(progress_file):
+            os.remove(progress_file)
     else:
         print("\n❌ No results found.")
 
+    if scraper.dead_letters:
+        print(
+            f"⚠️  {len(scraper.dead_letters)} queries failed, see "
+            "search_results_dead_letters.json (replay with replay_dead_letters)"
+        )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Result aggregation
+Keeps summary counters up to date as results are added, so summaries and
+live progress lines never rescan the result list.
+"""
+
+from collections import Counter
+from urllib.parse import urlsplit
+
+from url_index import canonical_url
+
+
+class ResultAggregator:
+    """Incremental counters by platform, query type, subreddit, category, query and domain"""
+
+    def __init__(self, results=()):
+        self.total = 0
+        self.platforms = Counter()
+        self.query_types = Counter()
+        self.subreddits = Counter()
+        self.categories = Counter()
+        self.queries = Counter()
+        self.domains = Counter()
+        for result in results:
+            self.add(result)
+
+    def add(self, result):
+        """Count one SearchResult"""
+        self.total += 1
+        self.platforms[result.platform or "other"] += 1
+
+        query = result.query
+        if query:
+            self.query_types[query.type or "other"] += 1
+            self.subreddits[query.subreddit or "other"] += 1
+            self.categories[query.category or "other"] += 1
+            self.queries[query.query] += 1
+        else:
+            self.query_types["other"] += 1
+            self.subreddits["other"] += 1
+            self.categories["other"] += 1
+
+        domain = urlsplit(canonical_url(result.url)).hostname or "other"
+        self.domains[domain] += 1
+
+    def summary(self):
+        """Return the counters as plain dicts"""
+        return {
+            "total_results": self.total,
+            "platforms": dict(self.platforms),
+            "query_types": dict(self.query_types),
+            "subreddits": dict(self.subreddits),
+            "categories": dict(self.categories),
+            "queries": dict(self.queries),
+            "domains": dict(self.domains),
+        }
+
+    def progress_line(self):
+        """One-line live view of the run so far"""
+        platforms = ", ".join(
+            f"{platform}: {count}" for platform, count in self.platforms.most_common(3)
+        )
+        return (
+            f"📈 {self.total} results from {len(self.queries)} queries "
+            f"across {len(self.domains)} domains ({platforms})"
+        )
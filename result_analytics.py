@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Columnar result analytics
+Loads search_results*.json files, result archives and progress journals
+into column arrays
+(dictionary-encoded strings, float numbers) and answers grouped counts,
+per-query yield, intensity distributions and top-N rankings in vectorized
+form, e.g. pain intensity by subreddit by query pattern by week.
+Uses NumPy when it is installed and plain Python otherwise.
+
+    python3 result_analytics.py "search_results*.json"
+"""
+
+import json
+import math
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+
+from result_history import history_files, iter_results
+from run_planner import query_pattern
+from url_index import canonical_url
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Columns stored as integer codes into a per-column list of labels
+CATEGORICAL_COLUMNS = (
+    "subreddit",
+    "category",
+    "query_type",
+    "source_query",
+    "pattern",
+    "platform",
+    "insight_type",
+    "domain",
+)
+# Columns stored as floats, NaN where a result has no value
+NUMERIC_COLUMNS = (
+    "timestamp",
+    "insight_intensity",
+    "pain_intensity",
+    "desire_intensity",
+)
+# Archive columns add() reads; the text columns are skipped unparsed
+ARCHIVE_COLUMNS = (
+    "url",
+    "source_query",
+    "query_type",
+    "subreddit",
+    "category",
+    "timestamp",
+    "platform",
+    "insight_type",
+    "insight_intensity",
+    "pain_intensity",
+    "desire_intensity",
+)
+# Time buckets that can be grouped by, in seconds (UTC)
+PERIODS = {"day": 86400, "week": 7 * 86400}
+# 1970-01-01 was a Thursday; shifting by three days starts weeks on Monday
+WEEK_OFFSET = 3 * 86400
+
+NAN = float("nan")
+
+
+def _number(value):
+    return NAN if value is None else float(value)
+
+
+def _period_label(bucket, period):
+    offset = WEEK_OFFSET if period == "week" else 0
+    start = bucket * PERIODS[period] - offset
+    return datetime.fromtimestamp(start, timezone.utc).date().isoformat()
+
+
+class ResultColumns:
+    """A result set as columns, built once and then queried many times"""
+
+    def __init__(self, use_numpy=None):
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else use_numpy
+        self.size = 0
+        # column -> labels (code -> value) and value -> code while loading
+        self.labels = {name: [] for name in CATEGORICAL_COLUMNS}
+        self._codes_of = {name: {} for name in CATEGORICAL_COLUMNS}
+        # Typed arrays keep millions of rows compact; NumPy views them in place
+        self.codes = {name: array("l") for name in CATEGORICAL_COLUMNS}
+        self.values = {name: array("d") for name in NUMERIC_COLUMNS}
+        # Canonical URLs loaded so far, for deduplication across runs
+        self.seen_urls = set()
+
+    def _encode(self, name, value):
+        codes_of = self._codes_of[name]
+        code = codes_of.get(value)
+        if code is None:
+            code = codes_of[value] = len(self.labels[name])
+            self.labels[name].append(value)
+        self.codes[name].append(code)
+
+    def add(self, result, dedupe=True):
+        """Append one result dict; with dedupe, URLs already loaded are skipped"""
+        url_key = canonical_url(result.get("url", ""))
+        if dedupe:
+            if url_key in self.seen_urls:
+                return False
+            self.seen_urls.add(url_key)
+
+        source_query = result.get("source_query")
+        row = {
+            "subreddit": result.get("subreddit"),
+            "category": result.get("category"),
+            "query_type": result.get("query_type"),
+            "source_query": source_query,
+            "pattern": query_pattern(source_query) if source_query else None,
+            "platform": result.get("platform"),
+            "insight_type": result.get("insight_type"),
+            # Canonical URLs are "https://host[:port]/path..."
+            "domain": url_key[8:].split("/", 1)[0].split(":", 1)[0] or None,
+        }
+        for name, value in row.items():
+            self._encode(name, value)
+
+        timestamp = result.get("timestamp")
+        self.values["timestamp"].append(
+            datetime.fromisoformat(timestamp).timestamp() if timestamp else NAN
+        )
+        for name in NUMERIC_COLUMNS[1:]:
+            self.values[name].append(_number(result.get(name)))
+        self.size += 1
+        return True
+
+    def load_file(self, filename, dedupe=True):
+        """Load a results document, archive or progress journal, return the rows added"""
+        results = iter_results(filename, ARCHIVE_COLUMNS)
+        return sum(self.add(result, dedupe) for result in results)
+
+    @classmethod
+    def from_files(cls, pattern="search_results*.json", dedupe=True, use_numpy=None):
+        """Columns of every result in the files matching a glob pattern"""
+        columns = cls(use_numpy)
+        results_files, _ = history_files(pattern)
+        for filename in results_files:
+            try:
+                columns.load_file(filename, dedupe)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping {filename}: {str(e)}")
+        return columns
+
+    def _values(self, name):
+        values = self.values[name]
+        return np.frombuffer(values, dtype=np.float64) if self.use_numpy else values
+
+    def _key(self, name):
+        """(codes, labels) of a column to group by: a categorical column, a
+        period of the timestamp ("day", "week") or an intensity column"""
+        if name in CATEGORICAL_COLUMNS:
+            codes = self.codes[name]
+            if self.use_numpy:
+                codes = np.frombuffer(codes, dtype=np.dtype(f"i{codes.itemsize}"))
+            return codes, self.labels[name]
+
+        if name in PERIODS:
+            offset = WEEK_OFFSET if name == "week" else 0
+            raw = self._values("timestamp")
+            if self.use_numpy:
+                raw = np.floor((raw + offset) / PERIODS[name])
+            else:
+                raw = [
+                    math.floor((value + offset) / PERIODS[name])
+                    if value == value
+                    else NAN
+                    for value in raw
+                ]
+
+            def labels_of(bucket):
+                return _period_label(int(bucket), name)
+
+        elif name in NUMERIC_COLUMNS:
+            raw, labels_of = self._values(name), int
+        else:
+            raise ValueError(f"Unknown column: {name}")
+
+        # Dictionary-encode the numbers; NaN (missing) becomes the label None
+        if self.use_numpy:
+            missing = np.isnan(raw)
+            uniques, codes = np.unique(np.where(missing, -1, raw), return_inverse=True)
+            labels = [None if value == -1 else labels_of(value) for value in uniques]
+            return codes, labels
+
+        codes_of, labels, codes = {}, [], []
+        for value in raw:
+            value = None if value != value else value
+            code = codes_of.get(value)
+            if code is None:
+                code = codes_of[value] = len(labels)
+                labels.append(None if value is None else labels_of(value))
+            codes.append(code)
+        return codes, labels
+
+    def group_counts(self, by, value=None, top=None):
+        """Rows of {column: label, ..., "count": n} per combination of the `by`
+        columns, largest first; with `value` (a numeric column) each row also
+        gets its mean and max over the results that have it"""
+        by = [by] if isinstance(by, str) else list(by)
+        if not self.size:
+            return []
+        keys = [self._key(name) for name in by]
+        sizes = [len(labels) for _, labels in keys]
+        if self.use_numpy:
+            groups = self._group_numpy(keys, sizes, value)
+        else:
+            groups = self._group_python(keys, value)
+
+        rows = []
+        for combination, count, stats in groups[:top] if top else groups:
+            row = {
+                name: labels[code]
+                for name, (_, labels), code in zip(by, keys, combination)
+            }
+            row["count"] = count
+            if value:
+                mean, maximum = stats
+                row[f"mean_{value}"] = round(mean, 3) if mean is not None else None
+                row[f"max_{value}"] = maximum
+            rows.append(row)
+        return rows
+
+    def _group_numpy(self, keys, sizes, value):
+        # One int64 key per row combining the codes of every grouping column
+        combined = np.zeros(self.size, dtype=np.int64)
+        for (codes, _), size in zip(keys, sizes):
+            combined = combined * size + codes
+        uniques, inverse, counts = np.unique(
+            combined, return_inverse=True, return_counts=True
+        )
+
+        means = maxima = None
+        if value:
+            values = self._values(value)
+            present = ~np.isnan(values)
+            groups = inverse[present]
+            sums = np.bincount(groups, weights=values[present], minlength=len(uniques))
+            totals = np.bincount(groups, minlength=len(uniques))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = sums / totals
+            maxima = np.full(len(uniques), -np.inf)
+            np.maximum.at(maxima, groups, values[present])
+
+        result = []
+        for index in np.argsort(-counts, kind="stable"):
+            key, combination = int(uniques[index]), []
+            for size in reversed(sizes):
+                key, code = divmod(key, size)
+                combination.append(code)
+            stats = None
+            if value:
+                has_values = np.isfinite(maxima[index])
+                stats = (
+                    float(means[index]) if has_values else None,
+                    float(maxima[index]) if has_values else None,
+                )
+            result.append((tuple(reversed(combination)), int(counts[index]), stats))
+        return result
+
+    def _group_python(self, keys, value):
+        combinations = list(zip(*(codes for codes, _ in keys)))
+        counts = Counter(combinations)
+
+        sums, totals, maxima = Counter(), Counter(), {}
+        if value:
+            for combination, number in zip(combinations, self._values(value)):
+                if number != number:
+                    continue
+                sums[combination] += number
+                totals[combination] += 1
+                if number > maxima.get(combination, -math.inf):
+                    maxima[combination] = number
+
+        result = []
+        for combination, count in counts.most_common():
+            stats = None
+            if value:
+                total = totals[combination]
+                stats = (
+                    sums[combination] / total if total else None,
+                    maxima.get(combination),
+                )
+            result.append((combination, count, stats))
+        return result
+
+    def query_yields(self, top=None):
+        """Results per source query, most productive first"""
+        return self.group_counts("source_query", top=top)
+
+    def intensity_distribution(self, column="insight_intensity", by=()):
+        """Results per intensity value, optionally split by other columns"""
+        by = [by] if isinstance(by, str) else list(by)
+        columns = by + [column]
+        rows = self.group_counts(columns)
+        return sorted(
+            rows,
+            key=lambda row: tuple((row[name] is None, row[name]) for name in columns),
+        )
+
+    def top_n(self, column, n=10, value=None):
+        """The n most frequent labels of a column"""
+        return self.group_counts(column, value=value, top=n)
+
+    def summary(self, top=10):
+        """Counts by the main dimensions, in one JSON-compatible dict"""
+        return {
+            "total_results": self.size,
+            "backend": "numpy" if self.use_numpy else "python",
+            "platforms": self.group_counts("platform"),
+            "subreddits": self.group_counts("subreddit", value="pain_intensity"),
+            "categories": self.group_counts("category"),
+            "query_types": self.group_counts("query_type"),
+            "insight_types": self.group_counts("insight_type"),
+            "top_domains": self.top_n("domain", top),
+            "top_queries": self.query_yields(top),
+            "insight_intensity": self.intensity_distribution(),
+            "pain_by_subreddit_pattern_week": self.group_counts(
+                ["subreddit", "pattern", "week"], value="pain_intensity", top=top
+            ),
+        }
+
+
+def main(pattern=None):
+    """Print a columnar summary of the result files matching a glob pattern"""
+    if pattern is None:
+        pattern = sys.argv[1] if len(sys.argv) > 1 else "search_results*.json"
+    columns = ResultColumns.from_files(pattern)
+    if not columns.size:
+        print(f"❌ No results found in {pattern}")
+        return
+
+    summary = columns.summary()
+    print(f"📊 {summary['total_results']} unique results ({summary['backend']} backend)")
+    if not columns.use_numpy:
+        print("   (pip install numpy, an optional extra, to vectorize these reports)")
+    for section, column in (
+        ("platforms", "platform"),
+        ("subreddits", "subreddit"),
+        ("insight_types", "insight_type"),
+        ("top_queries", "source_query"),
+    ):
+        print(f"\n{section.replace('_', ' ').title()}:")
+        for row in summary[section]:
+            print(f"  {row[column]}: {row['count']}")
+
+    print("\nPain intensity by subreddit, pattern and week:")
+    for row in summary["pain_by_subreddit_pattern_week"]:
+        print(
+            f"  r/{row['subreddit']} | {row['pattern']} | {row['week']}: "
+            f"{row['count']} results, mean pain {row['mean_pain_intensity']}"
+        )
+
+    output = "results_analytics.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Analytics saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
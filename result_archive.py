@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Compressed result archives
+Stores results in blocks of columns, as JSON lines that are each compressed
+on their own (gzip members, or zstd frames when the zstandard package is
+installed), so `zcat search_results.jsonl.gz` still prints plain JSON lines.
+Every block of up to block_size results is a line of block metadata, with
+the compressed size of each column, followed by one line per column;
+subreddit, category, query type, platform, source query and insight type
+are dictionary-encoded. Archives are written and read one block at a time,
+readers skip the columns they do not need (markdown above all) without
+decompressing them, and archives convert back to the search_results.json
+format.
+
+    python3 result_archive.py pack search_results.json      # -> .jsonl.gz
+    python3 result_archive.py unpack search_results.jsonl.gz
+    python3 result_archive.py unpack --force search_results.jsonl.gz  # overwrite
+"""
+
+import gzip
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+
+from result_records import (
+    INSIGHT_FIELDS,
+    QueryTable,
+    SearchResult,
+    write_results_document,
+)
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+ARCHIVE_FORMAT = "search_results_archive"
+ARCHIVE_VERSION = 1
+# File suffix -> compression
+SUFFIXES = {".jsonl.gz": "gzip", ".jsonl.zst": "zstd"}
+# Bytes read at a time while looking for the end of a metadata line
+READ_SIZE = 4096
+
+# Columns of a block, in order; timestamps are kept as epoch seconds
+COLUMNS = (
+    "url",
+    "title",
+    "description",
+    "markdown",
+    "source_query",
+    "query_type",
+    "subreddit",
+    "category",
+    "timestamp",
+    "platform",
+) + INSIGHT_FIELDS + ("extra",)
+# Columns stored as integer codes into a dictionary that grows block by block
+DICTIONARY_COLUMNS = (
+    "source_query",
+    "query_type",
+    "subreddit",
+    "category",
+    "platform",
+    "insight_type",
+)
+
+
+def is_archive(filename):
+    return filename.endswith(tuple(SUFFIXES))
+
+
+def archive_filename(filename, compression="gzip"):
+    """Archive name next to a results file, e.g. search_results.jsonl.gz"""
+    suffix = {codec: suffix for suffix, codec in SUFFIXES.items()}[compression]
+    return os.path.splitext(filename)[0] + suffix
+
+
+def _compression(filename):
+    """Compression of an archive, from its suffix"""
+    for suffix, compression in SUFFIXES.items():
+        if filename.endswith(suffix):
+            if compression == "zstd" and not ZSTD_AVAILABLE:
+                raise ImportError("zstandard is required for .zst archives")
+            return compression
+    raise ValueError(f"Not a result archive: {filename}")
+
+
+def _compress(value, compression):
+    """One JSON line as a gzip member or zstd frame"""
+    data = (json.dumps(value, ensure_ascii=False) + "\n").encode("utf-8")
+    if compression == "gzip":
+        # Level 6 compresses nearly as well as 9 at a fraction of the time
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def _decompress(data, compression):
+    if compression == "gzip":
+        return json.loads(gzip.decompress(data))
+    return json.loads(zstandard.ZstdDecompressor().decompress(data))
+
+
+def _read_line(f, compression):
+    """Decompress the next member of unknown size, None at the end of the file
+
+    Used for metadata lines, which are small; the file is left positioned
+    right after the member.
+    """
+    if compression == "gzip":
+        decompressor = zlib.decompressobj(wbits=31)
+    else:
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    data = b""
+    while not decompressor.eof:
+        chunk = f.read(READ_SIZE)
+        if not chunk:
+            if data:
+                raise ValueError(f"Truncated archive: {f.name}")
+            return None
+        data += decompressor.decompress(chunk)
+    f.seek(-len(decompressor.unused_data), os.SEEK_CUR)
+    return json.loads(data)
+
+
+def _column_values(result):
+    """Values of a SearchResult in COLUMNS order"""
+    query = result.query
+    key_phrases = result.key_phrases
+    return (
+        result.url,
+        result.title,
+        result.description,
+        result.markdown,
+        query.query if query else None,
+        query.type if query else None,
+        query.subreddit if query else None,
+        query.category if query else None,
+        result.timestamp,
+        result.platform,
+        result.insight_type,
+        result.insight_intensity,
+        result.pain_intensity,
+        result.desire_intensity,
+        list(key_phrases) if key_phrases is not None else None,
+        result.extra,
+    )
+
+
+class ArchiveWriter:
+    """Streams SearchResults into an archive, one block of columns at a time"""
+
+    def __init__(self, filename, block_size=1000):
+        self.filename = filename
+        self.block_size = block_size
+        self.compression = _compression(filename)
+        self.file = open(filename, "wb")
+        self.count = 0
+        self.block = []
+        # Dictionary column -> value -> code, for the whole archive
+        self.codes = {name: {} for name in DICTIONARY_COLUMNS}
+        header = {
+            "format": ARCHIVE_FORMAT,
+            "version": ARCHIVE_VERSION,
+            "timestamp": datetime.now().isoformat(),
+            "columns": COLUMNS,
+            "dictionary_columns": DICTIONARY_COLUMNS,
+        }
+        self.file.write(_compress(header, self.compression))
+
+    def add(self, result):
+        self.block.append(_column_values(result))
+        self.count += 1
+        if len(self.block) >= self.block_size:
+            self.flush()
+
+    def add_all(self, results):
+        for result in results:
+            self.add(result)
+        return self.count
+
+    def flush(self):
+        """Write the buffered results as one block"""
+        if not self.block:
+            return
+        rows, self.block = self.block, []
+        columns = dict(zip(COLUMNS, (list(values) for values in zip(*rows))))
+
+        # Values first seen in this block extend the dictionaries
+        new_values = {}
+        for name in DICTIONARY_COLUMNS:
+            codes = self.codes[name]
+            encoded = []
+            for value in columns[name]:
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(codes)
+                    new_values.setdefault(name, []).append(value)
+                encoded.append(code)
+            columns[name] = encoded
+
+        # Block metadata, then the columns in COLUMNS order, one per line
+        compressed = [_compress(columns[name], self.compression) for name in COLUMNS]
+        block = {
+            "rows": len(rows),
+            "dictionary": new_values,
+            "sizes": [len(data) for data in compressed],
+        }
+        self.file.write(_compress(block, self.compression))
+        for data in compressed:
+            self.file.write(data)
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _blocks(filename, columns=None):
+    """Yield (rows, {column: values}) per block, dictionary columns decoded;
+    columns outside `columns` (default: all) are skipped undecompressed"""
+    compression = _compression(filename)
+    with open(filename, "rb") as f:
+        header = _read_line(f, compression)
+        if not isinstance(header, dict) or header.get("format") != ARCHIVE_FORMAT:
+            raise ValueError(f"Not a result archive: {filename}")
+        if header["version"] > ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version {header['version']}")
+
+        names = header["columns"]
+        wanted = set(names if columns is None else columns)
+        labels = {name: [] for name in header["dictionary_columns"]}
+        while True:
+            block = _read_line(f, compression)
+            if block is None:
+                break
+            for name, values in block["dictionary"].items():
+                labels[name].extend(values)
+            decoded = {}
+            for name, size in zip(names, block["sizes"]):
+                if name not in wanted:
+                    f.seek(size, os.SEEK_CUR)
+                    continue
+                values = _decompress(f.read(size), compression)
+                if name in labels:
+                    name_labels = labels[name]
+                    values = [name_labels[code] for code in values]
+                decoded[name] = values
+            yield block["rows"], decoded
+
+
+def _rows(filename, columns=None):
+    """Yield {column: value} per result"""
+    for _, decoded in _blocks(filename, columns):
+        names = list(decoded)
+        for row in zip(*decoded.values()):
+            yield dict(zip(names, row))
+
+
+def iter_results(filename, query_table=None):
+    """Yield the SearchResults of an archive, one block in memory at a time"""
+    if query_table is None:
+        query_table = QueryTable()
+    for values in _rows(filename):
+        result = SearchResult(
+            values["url"],
+            values["title"],
+            values["description"],
+            values["markdown"],
+        )
+        if values["source_query"] is not None:
+            result.query = query_table.intern(
+                values["source_query"],
+                values["query_type"],
+                values["subreddit"],
+                values["category"],
+            )
+        result.timestamp = values["timestamp"]
+        result.platform = values["platform"]
+        for field in INSIGHT_FIELDS:
+            value = values[field]
+            if value is not None and field == "key_phrases":
+                value = tuple(value)
+            setattr(result, field, value)
+        result.extra = values["extra"]
+        yield result
+
+
+def iter_result_dicts(filename, columns=None):
+    """Yield the results of an archive as search_results.json result dicts
+
+    With `columns`, the dicts only hold those keys, and the other columns
+    are not even decompressed.
+    """
+    for values in _rows(filename, columns):
+        timestamp = values.get("timestamp")
+        if timestamp is not None:
+            # Same conversion as SearchResult.to_dict()
+            values["timestamp"] = datetime.fromtimestamp(timestamp).isoformat()
+        extra = values.pop("extra", None)
+        for field in INSIGHT_FIELDS:
+            if field in values and values[field] is None:
+                del values[field]
+        if extra:
+            values.update(extra)
+        yield values
+
+
+def count_results(filename):
+    """Number of results in an archive"""
+    return sum(rows for rows, _ in _blocks(filename, columns=()))
+
+
+def write_archive(filename, results, block_size=1000):
+    """Write SearchResults to an archive, return how many were written"""
+    with ArchiveWriter(filename, block_size) as writer:
+        return writer.add_all(results)
+
+
+def _check_output(filename, overwrite):
+    if not overwrite and os.path.exists(filename):
+        raise FileExistsError(f"{filename} already exists")
+
+
+def archive_to_json(filename, json_filename=None, overwrite=False):
+    """Convert an archive back to a search_results.json document
+
+    Refuses to replace an existing file unless overwrite is set, since the
+    default output is usually the results file the archive was made from.
+    """
+    if json_filename is None:
+        json_filename = filename[: -len(_suffix(filename))] + ".json"
+    _check_output(json_filename, overwrite)
+    # Counting first keeps the conversion streaming, at the cost of a second read
+    total = count_results(filename)
+    with open(json_filename, "w", encoding="utf-8") as f:
+        write_results_document(
+            f, iter_results(filename), datetime.now().isoformat(), total=total
+        )
+    return json_filename
+
+
+def json_to_archive(json_filename, filename=None, compression="gzip", overwrite=False):
+    """Convert a search_results.json document to an archive (refusing to
+    replace an existing one unless overwrite is set)"""
+    if filename is None:
+        filename = archive_filename(json_filename, compression)
+    _check_output(filename, overwrite)
+    query_table = QueryTable()
+    with open(json_filename, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    write_archive(
+        filename,
+        (SearchResult.from_dict(result, query_table) for result in data.get("results", [])),
+    )
+    return filename
+
+
+def _suffix(filename):
+    return next(suffix for suffix in SUFFIXES if filename.endswith(suffix))
+
+
+def main(argv=None):
+    """Pack results files into archives or unpack archives into results files"""
+    argv = sys.argv[1:] if argv is None else argv
+    overwrite = "--force" in argv
+    argv = [arg for arg in argv if arg != "--force"]
+    if len(argv) < 2 or argv[0] not in ("pack", "unpack"):
+        print("Usage: python3 result_archive.py pack|unpack [--force] FILE...")
+        return
+
+    command, filenames = argv[0], argv[1:]
+    for filename in filenames:
+        if not os.path.exists(filename):
+            print(f"❌ {filename} not found.")
+            continue
+        try:
+            if command == "pack":
+                output = json_to_archive(filename, overwrite=overwrite)
+            else:
+                output = archive_to_json(filename, overwrite=overwrite)
+        except FileExistsError as e:
+            print(f"❌ {e}, not overwritten (use --force to replace it).")
+            continue
+        before, after = os.path.getsize(filename), os.path.getsize(output)
+        print(f"🗜️  {filename} ({before:,} bytes) -> {output} ({after:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
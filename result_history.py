@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Result history
+One reader for what earlier runs left behind under a glob such as
+search_results*.json: results documents, result archives and progress
+journals, and the run reports saved next to them. Dead-letter files share
+the name prefix and are skipped. Results documents are streamed one result
+at a time, so reading history never holds a whole file in memory.
+"""
+
+import glob
+import json
+
+from progress_journal import ProgressJournal
+from query_loader import iter_document_array
+from result_archive import is_archive, iter_result_dicts
+
+RUN_REPORT_SUFFIX = "_run_report.json"
+DEAD_LETTERS_SUFFIX = "_dead_letters.json"
+
+
+def split_history(filenames):
+    """(results files, run reports) among filenames, dead letters dropped"""
+    results_files, run_reports = [], []
+    for filename in filenames:
+        if filename.endswith(RUN_REPORT_SUFFIX):
+            run_reports.append(filename)
+        elif not filename.endswith(DEAD_LETTERS_SUFFIX):
+            results_files.append(filename)
+    return results_files, run_reports
+
+
+def history_files(pattern):
+    """(results files, run reports) matching a glob pattern, each sorted"""
+    return split_history(sorted(glob.glob(pattern)))
+
+
+def iter_results(filename, columns=None):
+    """Yield the result dicts of a results document, archive or progress journal
+
+    `columns` only narrows what is decompressed from archives. Documents
+    without a "results" array (run reports, dead letters) yield nothing.
+    """
+    if is_archive(filename):
+        yield from iter_result_dicts(filename, columns)
+    elif filename.endswith(".jsonl"):
+        yield from ProgressJournal.read_results(filename)
+    else:
+        with open(filename, "r", encoding="utf-8") as f:
+            yield from iter_document_array(f, "results")
+
+
+def iter_all_results(filenames, columns=None):
+    """Yield the results of several files, skipping unreadable ones"""
+    for filename in filenames:
+        try:
+            yield from iter_results(filename, columns)
+        except (OSError, ValueError):
+            continue
+
+
+def iter_query_yields(run_reports):
+    """Yield (query text, new results) for every query of the run reports,
+    including the queries that found nothing"""
+    for filename in run_reports:
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(report, dict):
+            yield from (report.get("query_yields") or {}).items()
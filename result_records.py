@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Compact result records
+Search results are stored as slotted objects that share one QueryRecord per
+query and keep timestamps as numbers. They are turned into the JSON schema
+used by search_results.json only when saved.
+"""
+
+import json
+import textwrap
+from datetime import datetime
+
+# Insight fields added by InsightAnalyzer, in output order
+INSIGHT_FIELDS = (
+    "insight_type",
+    "insight_intensity",
+    "pain_intensity",
+    "desire_intensity",
+    "key_phrases",
+)
+
+# Keys written by to_dict() and understood by from_dict()
+KNOWN_FIELDS = {
+    "url",
+    "title",
+    "description",
+    "markdown",
+    "source_query",
+    "query_type",
+    "subreddit",
+    "category",
+    "timestamp",
+    "platform",
+} | set(INSIGHT_FIELDS)
+
+
+class QueryRecord:
+    """Query metadata shared by every result the query returned"""
+
+    __slots__ = ("query", "type", "subreddit", "category")
+
+    def __init__(self, query, type, subreddit, category):
+        self.query = query
+        self.type = type
+        self.subreddit = subreddit
+        self.category = category
+
+
+class QueryTable:
+    """Interns QueryRecords so equal queries share a single object"""
+
+    def __init__(self):
+        self.records = {}
+
+    def get(self, query_obj):
+        """Return the shared record for a query object from load_queries_from_json"""
+        return self.intern(
+            query_obj["query"],
+            query_obj.get("type"),
+            query_obj.get("subreddit"),
+            query_obj.get("category"),
+        )
+
+    def intern(self, query, type, subreddit, category):
+        key = (query, type, subreddit, category)
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = QueryRecord(*key)
+        return record
+
+    def __len__(self):
+        return len(self.records)
+
+
+class SearchResult:
+    """One search hit"""
+
+    __slots__ = (
+        "url",
+        "title",
+        "description",
+        "markdown",
+        "query",
+        "timestamp",
+        "platform",
+        "insight_type",
+        "insight_intensity",
+        "pain_intensity",
+        "desire_intensity",
+        "key_phrases",
+        "extra",
+    )
+
+    def __init__(self, url, title="", description="", markdown=""):
+        self.url = url
+        self.title = title
+        self.description = description
+        self.markdown = markdown
+        self.query = None
+        self.timestamp = None
+        self.platform = None
+        self.insight_type = None
+        self.insight_intensity = None
+        self.pain_intensity = None
+        self.desire_intensity = None
+        self.key_phrases = None
+        # Unknown keys from older result files, kept so they survive a re-save
+        self.extra = None
+
+    def to_dict(self):
+        """Serialize to the search_results.json result schema"""
+        query = self.query
+        data = {
+            "url": self.url,
+            "title": self.title,
+            "description": self.description,
+            "markdown": self.markdown,
+            "source_query": query.query if query else None,
+            "query_type": query.type if query else None,
+            "subreddit": query.subreddit if query else None,
+            "category": query.category if query else None,
+            "timestamp": (
+                datetime.fromtimestamp(self.timestamp).isoformat()
+                if self.timestamp is not None
+                else None
+            ),
+            "platform": self.platform,
+        }
+        for field in INSIGHT_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = list(value) if field == "key_phrases" else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data, query_table):
+        """Build a record from a result dict read from a results file or journal"""
+        result = cls(
+            data.get("url", ""),
+            data.get("title", ""),
+            data.get("description", ""),
+            data.get("markdown") or "",
+        )
+        if data.get("source_query") is not None:
+            result.query = query_table.intern(
+                data["source_query"],
+                data.get("query_type"),
+                data.get("subreddit"),
+                data.get("category"),
+            )
+        if data.get("timestamp"):
+            result.timestamp = datetime.fromisoformat(data["timestamp"]).timestamp()
+        result.platform = data.get("platform")
+        for field in INSIGHT_FIELDS:
+            if data.get(field) is not None:
+                value = data[field]
+                setattr(result, field, tuple(value) if field == "key_phrases" else value)
+
+        extra = {key: value for key, value in data.items() if key not in KNOWN_FIELDS}
+        result.extra = extra or None
+        return result
+
+
+def write_results_document(f, results, timestamp, total=None):
+    """Stream {"total_results", "timestamp", "results"} to f, one record at a time
+
+    The output is byte-identical to json.dump(..., indent=2, ensure_ascii=False)
+    without materializing every result dict at once. results may be any
+    iterable when total (its length) is given.
+    """
+    if total is None:
+        total = len(results)
+    f.write("{\n")
+    f.write(f'  "total_results": {total},\n')
+    f.write(f'  "timestamp": {json.dumps(timestamp)},\n')
+    f.write('  "results": [')
+    written = 0
+    for result in results:
+        f.write(",\n" if written else "\n")
+        encoded = json.dumps(result.to_dict(), indent=2, ensure_ascii=False)
+        f.write(textwrap.indent(encoded, "    "))
+        written += 1
+    f.write("\n  ]\n}" if written else "]\n}")
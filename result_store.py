@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+SQLite result store
+Keeps search results in an indexed SQLite database (WAL mode), written in
+batched transactions, so downstream questions such as "all pain points in
+r/SaaS this week" are answered with a query instead of loading the whole
+results file. export_json() still writes the search_results.json format.
+Each row also keeps a fingerprint of its content for incremental re-crawls.
+"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+
+from result_records import (
+    INSIGHT_FIELDS,
+    QueryTable,
+    SearchResult,
+    write_results_document,
+)
+from url_index import canonical_url
+
+# Result columns in insert order; url_key (the canonical URL) is the unique key
+COLUMNS = (
+    "url_key",
+    "url",
+    "title",
+    "description",
+    "markdown",
+    "source_query",
+    "query_type",
+    "subreddit",
+    "category",
+    "timestamp",
+    "platform",
+) + INSIGHT_FIELDS + ("extra", "fingerprint")
+
+SCHEMA = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    url_key TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    title TEXT,
+    description TEXT,
+    markdown TEXT,
+    source_query TEXT,
+    query_type TEXT,
+    subreddit TEXT,
+    category TEXT,
+    timestamp REAL,
+    platform TEXT,
+    insight_type TEXT,
+    insight_intensity INTEGER,
+    pain_intensity INTEGER,
+    desire_intensity INTEGER,
+    key_phrases TEXT,
+    extra TEXT,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS results_url ON results (url);
+CREATE INDEX IF NOT EXISTS results_subreddit ON results (subreddit);
+CREATE INDEX IF NOT EXISTS results_category ON results (category);
+CREATE INDEX IF NOT EXISTS results_query_type ON results (query_type);
+CREATE INDEX IF NOT EXISTS results_timestamp ON results (timestamp);
+
+-- Full-text index over the text columns, kept in sync by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(
+    title, description, markdown, content='results', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS results_ai AFTER INSERT ON results BEGIN
+    INSERT INTO results_fts (rowid, title, description, markdown)
+    VALUES (new.id, new.title, new.description, new.markdown);
+END;
+CREATE TRIGGER IF NOT EXISTS results_ad AFTER DELETE ON results BEGIN
+    INSERT INTO results_fts (results_fts, rowid, title, description, markdown)
+    VALUES ('delete', old.id, old.title, old.description, old.markdown);
+END;
+CREATE TRIGGER IF NOT EXISTS results_au AFTER UPDATE ON results BEGIN
+    INSERT INTO results_fts (results_fts, rowid, title, description, markdown)
+    VALUES ('delete', old.id, old.title, old.description, old.markdown);
+    INSERT INTO results_fts (rowid, title, description, markdown)
+    VALUES (new.id, new.title, new.description, new.markdown);
+END;
+"""
+
+# A URL seen again replaces its stored row (the FTS index follows via results_au)
+UPSERT = (
+    f"INSERT INTO results ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNS)}) "
+    "ON CONFLICT(url_key) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in COLUMNS[1:])
+)
+# Seeding from earlier results files never replaces what the store holds
+INSERT_MISSING = (
+    f"INSERT INTO results ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNS)}) "
+    "ON CONFLICT(url_key) DO NOTHING"
+)
+
+
+def content_fingerprint(markdown):
+    """Hash of the markdown with case and whitespace normalized, None if empty"""
+    if not markdown:
+        return None
+    normalized = " ".join(markdown.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _row(result):
+    """Column values of a SearchResult, in COLUMNS order"""
+    query = result.query
+    key_phrases = result.key_phrases
+    return (
+        canonical_url(result.url),
+        result.url,
+        result.title,
+        result.description,
+        result.markdown,
+        query.query if query else None,
+        query.type if query else None,
+        query.subreddit if query else None,
+        query.category if query else None,
+        result.timestamp,
+        result.platform,
+        result.insight_type,
+        result.insight_intensity,
+        result.pain_intensity,
+        result.desire_intensity,
+        (
+            json.dumps(list(key_phrases), ensure_ascii=False)
+            if key_phrases is not None
+            else None
+        ),
+        json.dumps(result.extra, ensure_ascii=False) if result.extra else None,
+        content_fingerprint(result.markdown),
+    )
+
+
+def _to_timestamp(value):
+    return value.timestamp() if isinstance(value, datetime) else value
+
+
+class ResultStore:
+    """Indexed, full-text searchable SQLite table of search results"""
+
+    def __init__(self, filename, batch_size=100):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.pending = []
+        # Sharded runs may share the file across processes, so wait out their locks
+        self.connection = sqlite3.connect(filename, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        # Stores created before fingerprints were recorded
+        columns = {
+            row["name"] for row in self.connection.execute("PRAGMA table_info(results)")
+        }
+        if "fingerprint" not in columns:
+            self.connection.execute("ALTER TABLE results ADD COLUMN fingerprint TEXT")
+        self.connection.commit()
+
+    def add(self, result):
+        """Queue a SearchResult; queued results are written batch_size at a time"""
+        self.pending.append(_row(result))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the queued results in one transaction"""
+        if not self.pending:
+            return
+        rows, self.pending = self.pending, []
+        with self.connection:
+            self.connection.executemany(UPSERT, rows)
+
+    def fingerprint(self, url):
+        """Stored content fingerprint of a URL: None if the URL was never
+        stored, "" if it was stored without content"""
+        row = self.connection.execute(
+            "SELECT COALESCE(fingerprint, '') FROM results WHERE url_key = ?",
+            (canonical_url(url),),
+        ).fetchone()
+        return row[0] if row else None
+
+    def import_missing(self, results):
+        """Store result dicts whose URL is not stored yet, batch_size per
+        transaction, and return how many were read; stored rows are kept"""
+        self.flush()
+        query_table = QueryTable()
+        count = 0
+        rows = []
+        for result in results:
+            rows.append(_row(SearchResult.from_dict(result, query_table)))
+            count += 1
+            if len(rows) >= self.batch_size:
+                with self.connection:
+                    self.connection.executemany(INSERT_MISSING, rows)
+                rows = []
+        if rows:
+            with self.connection:
+                self.connection.executemany(INSERT_MISSING, rows)
+        return count
+
+    def get(self, url, query_table=None):
+        """Stored SearchResult of a URL (in any equivalent form), or None"""
+        self.flush()
+        row = self.connection.execute(
+            "SELECT * FROM results WHERE url_key = ?", (canonical_url(url),)
+        ).fetchone()
+        if row is None:
+            return None
+        return self._to_result(row, query_table or QueryTable())
+
+    def import_results_file(self, filename):
+        """Load a search_results.json document into the store"""
+        query_table = QueryTable()
+        with open(filename, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        results = data.get("results", [])
+        for result in results:
+            self.add(SearchResult.from_dict(result, query_table))
+        self.flush()
+        return len(results)
+
+    def _select(
+        self,
+        text=None,
+        subreddit=None,
+        category=None,
+        query_type=None,
+        insight_type=None,
+        since=None,
+        until=None,
+        limit=None,
+    ):
+        """Build the SELECT for the given filters; text is an FTS5 match expression"""
+        sql = "SELECT results.* FROM results"
+        conditions, params = [], []
+        if text:
+            sql += " JOIN results_fts ON results_fts.rowid = results.id"
+            conditions.append("results_fts MATCH ?")
+            params.append(text)
+        for column, value in (
+            ("subreddit", subreddit),
+            ("category", category),
+            ("query_type", query_type),
+            ("insight_type", insight_type),
+        ):
+            if value is not None:
+                conditions.append(f"results.{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("results.timestamp >= ?")
+            params.append(_to_timestamp(since))
+        if until is not None:
+            conditions.append("results.timestamp < ?")
+            params.append(_to_timestamp(until))
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY results_fts.rank" if text else " ORDER BY results.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def iter_results(self, query_table=None, **filters):
+        """Yield SearchResults matching the filters (see _select), one row at a time"""
+        self.flush()
+        if query_table is None:
+            query_table = QueryTable()
+        sql, params = self._select(**filters)
+        for row in self.connection.execute(sql, params):
+            yield self._to_result(row, query_table)
+
+    def search(self, **filters):
+        """Results matching the filters as result dicts, e.g.
+        search(insight_type="pain_point", subreddit="SaaS", since=week_ago)"""
+        return [result.to_dict() for result in self.iter_results(**filters)]
+
+    def count(self, **filters):
+        """Number of stored results matching the filters"""
+        self.flush()
+        sql, params = self._select(**filters)
+        return self.connection.execute(
+            f"SELECT COUNT(*) FROM ({sql})", params
+        ).fetchone()[0]
+
+    def _to_result(self, row, query_table):
+        result = SearchResult(
+            row["url"], row["title"] or "", row["description"] or "", row["markdown"] or ""
+        )
+        if row["source_query"] is not None:
+            result.query = query_table.intern(
+                row["source_query"], row["query_type"], row["subreddit"], row["category"]
+            )
+        result.timestamp = row["timestamp"]
+        result.platform = row["platform"]
+        for field in INSIGHT_FIELDS:
+            value = row[field]
+            if value is not None and field == "key_phrases":
+                value = tuple(json.loads(value))
+            setattr(result, field, value)
+        if row["extra"]:
+            result.extra = json.loads(row["extra"])
+        return result
+
+    def export_json(self, filename, **filters):
+        """Write matching results as a search_results.json document"""
+        total = self.count(**filters)
+        with open(filename, "w", encoding="utf-8") as f:
+            write_results_document(
+                f, self.iter_results(**filters), datetime.now().isoformat(), total=total
+            )
+        return total
+
+    def close(self):
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Retry policy for search requests
+Classifies errors as retryable or permanent (by exception type and HTTP
+status, not by numbers that happen to appear in a message), backs off with
+jittered exponential delays and honors Retry-After hints from the provider.
+"""
+
+import random
+import re
+import time
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+THROTTLED_STATUS = 429
+
+# Only statuses the message explicitly reports, e.g. "Firecrawl returned 429"
+# or "status code 503"; a bare number ("port=443", "top 500") is not one
+STATUS_IN_MESSAGE = re.compile(
+    r"\b(?:returned|status(?: code)?:?|HTTP(?: error)?:?)\s+([45]\d\d)\b",
+    re.IGNORECASE,
+)
+TIMEOUT_STATUS = {408, 504}
+RETRY_AFTER_IN_MESSAGE = re.compile(r"retry after (\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+class SearchError(Exception):
+    """A search that failed for good, after `attempts` tries"""
+
+    def __init__(self, error, attempts, retryable):
+        super().__init__(str(error))
+        self.error = error
+        self.attempts = attempts
+        self.retryable = retryable
+
+
+def _status_code(error):
+    """HTTP status of an exception raised by the search client: the
+    status_code of FirecrawlError / TransportError (or their response), else
+    one the message explicitly reports"""
+    for source in (error, getattr(error, "response", None)):
+        for attr in ("status_code", "status"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    match = STATUS_IN_MESSAGE.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def _retry_after(error):
+    """Seconds the provider asked us to wait, if it said so"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if value is None:
+        match = RETRY_AFTER_IN_MESSAGE.search(str(error))
+        value = match.group(1) if match else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _network_errors():
+    """(connection, timeout) exception types of requests, which are not the
+    builtin ConnectionError/TimeoutError; imported only once an error occurs"""
+    try:
+        from requests import exceptions
+    except ImportError:
+        return (), ()
+    return (exceptions.ConnectionError, exceptions.ChunkedEncodingError), (
+        exceptions.Timeout,
+    )
+
+
+def is_timeout(error):
+    """Whether an exception means the request timed out"""
+    _, timeouts = _network_errors()
+    if isinstance(error, (TimeoutError, *timeouts)):
+        return True
+    return _status_code(error) in TIMEOUT_STATUS
+
+
+def is_connection_error(error):
+    """Whether an exception is a connection reset, refusal or DNS failure"""
+    connection_errors, _ = _network_errors()
+    return isinstance(error, (ConnectionError, *connection_errors))
+
+
+def classify_error(error):
+    """Return (retryable, throttled, retry_after_seconds) for an exception"""
+    status = _status_code(error)
+
+    throttled = status == THROTTLED_STATUS or (
+        status is None and "rate limit exceeded" in str(error).lower()
+    )
+    if throttled:
+        return True, True, _retry_after(error)
+
+    if is_connection_error(error) or is_timeout(error):
+        return True, False, None
+    if status is not None:
+        return status in RETRYABLE_STATUS, False, _retry_after(error)
+
+    # Unknown failures (bad arguments, parsing bugs) will not fix themselves
+    return False, False, None
+
+
+class RetryPolicy:
+    """Jittered exponential backoff around a callable"""
+
+    def __init__(self, max_retries=3, base_delay=2.0, max_delay=60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt, retry_after=None):
+        """Delay before retry number `attempt` (1-based)
+
+        A provider's Retry-After is used as is; max_delay only caps the
+        computed exponential delay.
+        """
+        if retry_after is not None:
+            return max(0.0, retry_after)
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        # Jitter keeps workers from retrying in lockstep
+        return delay * random.uniform(0.5, 1.0)
+
+    def call(self, func, on_retry=None, on_throttle=None):
+        """Run func(), retrying retryable errors; raise SearchError when giving up
+
+        on_retry(attempt, error, delay) is called before each retry. When the
+        provider throttles us, the wait is handed to on_throttle(delay)
+        instead of sleeping here, so a shared rate limiter can slow the whole
+        run down rather than just this worker.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return func()
+            except Exception as e:
+                retryable, throttled, retry_after = classify_error(e)
+                if not retryable or attempt > self.max_retries:
+                    raise SearchError(e, attempt, retryable) from e
+
+                delay = self.backoff(attempt, retry_after)
+                if on_retry:
+                    on_retry(attempt, e, delay)
+                if throttled and on_throttle:
+                    on_throttle(delay)
+                else:
+                    time.sleep(delay)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Run metrics
+Per-phase timers, latency histograms and throughput counters for a scrape,
+written as a machine-readable run report next to the results file.
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from progress_journal import QUERY_ERROR
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in seconds"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                if i < len(self.buckets):
+                    return min(self.buckets[i], self.max)
+                return self.max
+        return self.max
+
+    def to_dict(self):
+        labels = [f"<={bound}s" for bound in self.buckets] + [
+            f">{self.buckets[-1]}s"
+        ]
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 3),
+            "mean_seconds": round(self.total / self.count, 3) if self.count else None,
+            "max_seconds": round(self.max, 3),
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class RunMetrics:
+    """Thread-safe counters and timers for one scrape run"""
+
+    def __init__(self, configured_rpm=None, hook=None):
+        self.configured_rpm = configured_rpm
+        # Called with an event dict after every query, e.g. to drive a dashboard;
+        # events carry a few running totals, call report() for the rest
+        self.hook = hook
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.counters = Counter()
+        self.results_per_query = Counter()
+        # query text -> new results it produced, used to prune dead queries later
+        self.query_yields = Counter()
+        self.errors = Counter()
+        # Adaptive concurrency controller whose state goes into the report
+        self.concurrency = None
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self):
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of code under a phase name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            histogram = self.phases.get(name)
+            if histogram is None:
+                histogram = self.phases[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def record_query(self, query_text, status, result_count):
+        """Count a finished query and notify the hook"""
+        with self.lock:
+            self.counters["queries_completed"] += 1
+            self.counters[f"queries_{status}"] += 1
+            self.results_per_query[result_count] += 1
+            # Failed searches say nothing about how productive a query is
+            if status != QUERY_ERROR:
+                self.query_yields[query_text] += result_count
+        self._notify(
+            {
+                "event": "query",
+                "query": query_text,
+                "status": status,
+                "results": result_count,
+            }
+        )
+
+    def record_error(self, query_text, error):
+        with self.lock:
+            self.errors[type(error).__name__] += 1
+        self._notify({"event": "error", "query": query_text, "error": str(error)})
+
+    def record_retry(self):
+        self.increment("retries")
+
+    def _notify(self, event):
+        if self.hook:
+            with self.lock:
+                event["metrics"] = {
+                    "elapsed_seconds": round(self.elapsed(), 3),
+                    "queries_completed": self.counters["queries_completed"],
+                    "queries_error": self.counters[f"queries_{QUERY_ERROR}"],
+                    "results_added": self.counters["results_added"],
+                    "errors": sum(self.errors.values()),
+                }
+            self.hook(event)
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def report(self):
+        """Return the run report as a JSON-compatible dict"""
+        with self.lock:
+            elapsed = self.elapsed()
+            completed = self.counters["queries_completed"]
+            achieved_qpm = completed / (elapsed / 60) if elapsed > 0 else None
+            return {
+                "started_at": (
+                    datetime.fromtimestamp(self.started_at).isoformat()
+                    if self.started_at
+                    else None
+                ),
+                "elapsed_seconds": round(elapsed, 3),
+                "queries_per_minute": round(achieved_qpm, 2) if achieved_qpm else None,
+                "configured_queries_per_minute": self.configured_rpm,
+                "counters": dict(self.counters),
+                "errors": dict(self.errors),
+                "results_per_query": {
+                    str(count): queries
+                    for count, queries in sorted(self.results_per_query.items())
+                },
+                "query_yields": dict(self.query_yields),
+                "phases": {
+                    name: histogram.to_dict() for name, histogram in self.phases.items()
+                },
+                "adaptive_concurrency": (
+                    self.concurrency.state() if self.concurrency else None
+                ),
+            }
+
+    def write_report(self, filename):
+        """Write the run report as JSON"""
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        return filename
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Run planner
+Turns a query table into the stream of queries a run should issue, driven by
+SCRAPING_CONFIG: filters by type, subreddit and category, ranks by the yield
+earlier run reports recorded, within a bounded look-ahead, and stops at
+max_queries.
+"""
+
+import glob
+import heapq
+import re
+from collections import Counter
+from itertools import islice
+
+from result_history import iter_query_yields, split_history
+from scraper_config import SCRAPING_CONFIG
+
+SUBREDDIT_IN_QUERY = re.compile(r"site:(?:www\.)?reddit\.com/r/([^\s/]+)", re.IGNORECASE)
+
+
+def query_pattern(query_text):
+    """The question pattern of a query, without its site: restriction"""
+    return query_text.split(" site:", 1)[0].strip().lower()
+
+
+def query_subreddit(query_text):
+    """The subreddit a query is restricted to, None for all of Reddit"""
+    match = SUBREDDIT_IN_QUERY.search(query_text)
+    return match.group(1).lower() if match else None
+
+
+class YieldHistory:
+    """New results per query run in earlier runs, by subreddit and pattern
+
+    Read from run reports, whose query_yields list every query a run issued,
+    including those that found nothing; results files only show the
+    productive ones.
+    """
+
+    def __init__(self):
+        self.subreddit_results = Counter()
+        self.subreddit_queries = Counter()
+        self.pattern_results = Counter()
+        self.pattern_queries = Counter()
+        self.total_results = 0
+        self.total_queries = 0
+
+    def add_query(self, query_text, result_count):
+        subreddit = query_subreddit(query_text)
+        pattern = query_pattern(query_text)
+
+        self.subreddit_results[subreddit] += result_count
+        self.subreddit_queries[subreddit] += 1
+        self.pattern_results[pattern] += result_count
+        self.pattern_queries[pattern] += 1
+        self.total_results += result_count
+        self.total_queries += 1
+
+    def load_files(self, filenames):
+        """Read the query yields of the run reports among filenames"""
+        _, run_reports = split_history(filenames)
+        for query_text, result_count in iter_query_yields(run_reports):
+            self.add_query(query_text, result_count)
+        return self
+
+    def _mean_yield(self, results, queries, key):
+        if not queries[key]:
+            return None
+        return results[key] / queries[key]
+
+    def score(self, query_obj):
+        """Average results per query for the query's subreddit and pattern
+
+        Combinations never seen before get None so the planner can give them
+        a neutral score instead of starving them.
+        """
+        query_text = query_obj["query"]
+        scores = [
+            self._mean_yield(
+                self.subreddit_results,
+                self.subreddit_queries,
+                query_subreddit(query_text),
+            ),
+            self._mean_yield(
+                self.pattern_results,
+                self.pattern_queries,
+                query_pattern(query_text),
+            ),
+        ]
+        scores = [score for score in scores if score is not None]
+        return sum(scores) / len(scores) if scores else None
+
+    def neutral_score(self):
+        """Average results per query over all earlier queries"""
+        return self.total_results / self.total_queries if self.total_queries else 0.0
+
+    def __bool__(self):
+        return bool(self.total_queries)
+
+
+class RunPlanner:
+    """Builds the lazy, filtered and prioritized query stream for a run"""
+
+    def __init__(self, config=None, history_files=None):
+        self.config = config or SCRAPING_CONFIG
+        if history_files is None and self.config.get("prioritize_by_yield"):
+            history_files = sorted(glob.glob(self.config["history_glob"]))
+        self.history = YieldHistory().load_files(history_files or [])
+
+    def accepts(self, query_obj):
+        """Whether a query passes the query_types/target_subreddits/categories filters"""
+        for config_key, query_field in (
+            ("query_types", "type"),
+            ("target_subreddits", "subreddit"),
+            ("categories", "category"),
+        ):
+            allowed = self.config.get(config_key)
+            if allowed is not None and query_obj.get(query_field) not in allowed:
+                return False
+        return True
+
+    def plan(self, queries):
+        """Yield the queries to run, best expected yield first when history exists"""
+        stream = (query_obj for query_obj in queries if self.accepts(query_obj))
+
+        if self.history:
+            stream = self._prioritize(stream)
+
+        max_queries = self.config.get("max_queries")
+        if max_queries is not None:
+            stream = islice(stream, max_queries)
+        return stream
+
+    def _prioritize(self, queries):
+        """Yield the best of the next priority_buffer queries, one at a time
+
+        Ranking the whole table would read all of it before the first search;
+        the buffer bounds that delay and the memory, at the cost of only
+        reordering queries that are less than a buffer apart.
+        """
+        size = self.config.get("priority_buffer") or 1
+        neutral = self.history.neutral_score()
+        buffer = []
+        for position, query_obj in enumerate(queries):
+            score = self.history.score(query_obj)
+            # The position keeps the table order among equally ranked queries
+            item = (-(neutral if score is None else score), position, query_obj)
+            if len(buffer) < size:
+                heapq.heappush(buffer, item)
+            else:
+                yield heapq.heappushpop(buffer, item)[2]
+        while buffer:
+            yield heapq.heappop(buffer)[2]
@@ -6,11 +6,57 @@ Configuration settings for the Reddit scraper
 # Scraping settings
 SCRAPING_CONFIG = {
     # Number of results per query (1-10 recommended)
-    "limit_per_query": 1,
+    "limit_per_query": 5,
     # Delay between queries in seconds (to avoid rate limiting)
     "delay_between_queries": 1,
+    # Search quota of the provider plan (Firecrawl free tier: 5 searches/minute)
+    "requests_per_minute": 5,
+    # Searches allowed back-to-back before the per-minute quota kicks in
+    "burst_size": 1,
+    # Number of searches kept in flight at once (1 = sequential)
+    "concurrent_searches": 1,
+    # Search without page content, then scrape the hits' URLs in batches
+    # (needs a backend with scrape_urls, e.g. the HTTP transport)
+    "batch_scrape": False,
+    # URLs sent per batch scrape request
+    "scrape_batch_size": 25,
+    # Two-phase crawl: metadata-only searches, then batch-scrape only URLs that
+    # earlier runs have not scraped or whose content is older than the max age;
+    # the others keep their stored content (this opens the result store)
+    "two_phase": False,
+    "content_max_age_days": 30,
+    # Persistent store of scraped URLs, seeded from history_glob result files
+    "seen_urls_file": "seen_urls.sqlite3",
+    # Incremental re-crawl: skip pages whose content is unchanged since it was
+    # stored in the result store, write only new or changed results to
+    # search_results_delta.json and export the full store to search_results.json
+    "incremental": False,
+    # Drop results whose title, description and content nearly duplicate an
+    # earlier result (same thread under another URL, crossposts, mirrors)
+    "near_duplicate_detection": True,
+    # Estimated Jaccard similarity of word shingles from which results count
+    # as duplicates
+    "near_duplicate_threshold": 0.7,
+    # Results with fewer words are only deduplicated by URL
+    "near_duplicate_min_tokens": 30,
+    # Worker processes for insight analysis and near-duplicate signatures,
+    # so text work never slows the search loop (0 = analyze in the loop,
+    # None = one per CPU core)
+    "analysis_workers": 0,
+    # Searches whose results may wait for analysis before new searches are
+    # held back, which bounds memory when analysis falls behind
+    "analysis_queue_size": 16,
+    # Retries for timeouts, 429s and 5xx errors before a query is dead-lettered
+    "max_retries": 3,
+    # First retry delay in seconds, doubled (with jitter) on every retry
+    "retry_base_delay": 2,
+    # Upper bound for the exponential retry delay in seconds (a provider's
+    # Retry-After is honored even when longer)
+    "retry_max_delay": 60,
     # Whether to save progress after each query
     "save_progress": True,
+    # Progress journal entries written between fsync calls
+    "journal_sync_every": 25,
     # Maximum queries to process (None for all)
     "max_queries": None,
     # Query types to include (None for all)
@@ -19,6 +65,115 @@ SCRAPING_CONFIG = {
     "target_subreddits": None,  # ["entrepreneur", "startups", "business"]
     # Categories to include (None for all)
     "categories": None,  # ["general_questions", "industry_specific", "subreddit_specific", "business_areas"]
+    # Run the subreddits/patterns that yielded most results in earlier runs first
+    "prioritize_by_yield": True,
+    # Earlier run reports (*_run_report.json) used to estimate that yield
+    "history_glob": "search_results*.json",
+    # Queries read ahead to pick the most productive from; bounds the memory
+    # and the delay before the first search
+    "priority_buffer": 1000,
+}
+
+# Adaptive concurrency (see rate_limiter.AdaptiveConcurrency): starting from
+# concurrent_searches and requests_per_minute, add a search in flight and
+# rpm_step searches/minute after every healthy window of searches, and halve
+# both on a 429 or a timeout, so unattended runs settle near the highest
+# throughput the plan sustains
+ADAPTIVE_CONFIG = {
+    "enabled": False,
+    # Bounds of the number of searches in flight
+    "min_concurrency": 1,
+    "max_concurrency": 16,
+    # Bounds of the request rate in searches/minute
+    "min_requests_per_minute": 1,
+    "max_requests_per_minute": 300,
+    # Searches/minute added per healthy window
+    "rpm_step": 5,
+    # Windows whose mean search latency exceeds this many seconds do not
+    # raise the limits (None = only errors count)
+    "latency_target_seconds": 10,
+    # Factor applied to both limits on a 429 or a timeout
+    "decrease_factor": 0.5,
+}
+
+# Firecrawl transport settings (see search_backends.py)
+TRANSPORT_CONFIG = {
+    # Talk to the REST API over a pooled requests.Session instead of the SDK
+    "use_http_transport": False,
+    "api_url": "https://api.firecrawl.dev",
+    # Keep-alive connection pool size (match concurrent_searches or higher)
+    "pool_connections": 4,
+    "pool_maxsize": 16,
+    # Seconds to establish a connection / to wait for a response
+    "connect_timeout": 5,
+    "read_timeout": 60,
+    # Server-side search timeout in milliseconds
+    "search_timeout_ms": 30000,
+    # Batch scrape job polling
+    "batch_poll_interval": 2,
+    "batch_wait_timeout": 300,
+}
+
+# Query generator settings (see query_engine.py)
+GENERATOR_CONFIG = {
+    # Subreddits every template is expanded for
+    "subreddits": [
+        "entrepreneur",
+        "startups",
+        "smallbusiness",
+        "business",
+        "marketing",
+        "sales",
+        "SaaS",
+        "ecommerce",
+        "freelance",
+        "consulting",
+    ],
+    # Question patterns (focused on business struggles)
+    "patterns": [
+        "how do I",
+        "struggling with",
+        "need help with",
+        "can't figure out",
+        "my business",
+        "looking for",
+    ],
+    # Also combine patterns with ANALYSIS_CONFIG["business_terms"]
+    "use_business_terms": False,
+    # Firecrawl time filters to expand over, None = any time (e.g. "qdr:w", "qdr:m")
+    "time_filters": [None],
+    # Skip queries that returned no new URLs in earlier runs
+    "prune_zero_yield": True,
+    # Earlier runs (run reports) a query must have come back empty in, and
+    # never productive, before it is pruned
+    "prune_after_runs": 3,
+    # Result files and run reports used to find those queries
+    "history_glob": "search_results*.json",
+}
+
+# Search response cache settings
+CACHE_CONFIG = {
+    # Whether to reuse responses of recently run searches
+    "enabled": True,
+    # SQLite file holding cached responses
+    "filename": "search_cache.sqlite3",
+    # How long a cached response stays valid (seconds)
+    "ttl_seconds": 24 * 60 * 60,
+    # Maximum cached responses before least recently used ones are evicted
+    "max_entries": 10000,
+}
+
+# SQLite result store settings (see result_store.py)
+STORAGE_CONFIG = {
+    # Also write results to an indexed, full-text searchable SQLite database
+    "use_result_store": False,
+    "filename": "search_results.sqlite3",
+    # Results written per transaction
+    "batch_size": 100,
+    # Also save results as a compressed columnar archive next to the JSON
+    # file: "gzip" (search_results.jsonl.gz), "zstd" (.jsonl.zst, needs the
+    # zstandard package) or None (see result_archive.py)
+    "archive_compression": None,
 }
 
 # Output settings
@@ -91,4 +246,10 @@ ANALYSIS_CONFIG = {
         "need",
         "wish there was",
     ],
+    # Intensity is indicator matches per intensity_words words (capped at 10),
+    # so long pages are not favored by length alone
+    "intensity_words": 1000,
+    # Shorter texts count as this many words: one indicator in a bare title
+    # and description scores 3, not 10
+    "intensity_min_words": 300,
 }
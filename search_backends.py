@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Search backends
+HTTP transport for the Firecrawl REST API that reuses a keep-alive connection
+pool, has separate connect/read timeouts and can scrape URLs in batches, plus
+an adapter that adds batch scraping to the Firecrawl SDK client.
+Any object with a Firecrawl-compatible search() can be used instead.
+"""
+
+import time
+from importlib.util import find_spec
+from types import SimpleNamespace
+
+from scraper_config import TRANSPORT_CONFIG
+from url_index import canonical_url
+
+# requests is imported by FirecrawlHttpBackend itself, so importing this
+# module stays cheap for commands that never open a connection
+REQUESTS_AVAILABLE = find_spec("requests") is not None
+
+
+class TransportError(Exception):
+    """Non-success HTTP response; status_code and response feed the retry policy"""
+
+    def __init__(self, message, status_code=None, response=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+
+def _to_namespace(item):
+    return SimpleNamespace(**item) if isinstance(item, dict) else item
+
+
+def item_field(obj, name, default=None):
+    """Attribute or key lookup, for SDK models and cached/plain dicts alike"""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def document_url(document):
+    """Source URL of a scraped document (SDK model or REST dict)"""
+    metadata = item_field(document, "metadata") or {}
+    return (
+        item_field(metadata, "source_url")
+        or item_field(metadata, "sourceURL")
+        or item_field(metadata, "url")
+        or ""
+    )
+
+
+class FirecrawlSdkBackend:
+    """Firecrawl SDK client with the scrape_urls() batch interface"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def search(self, **kwargs):
+        return self.client.search(**kwargs)
+
+    def scrape_urls(self, urls, scrape_options=None):
+        """Scrape many URLs with one batch job, return {canonical url: markdown}"""
+        scrape_options = scrape_options or {}
+        job = self.client.batch_scrape(
+            list(urls),
+            formats=scrape_options.get("formats"),
+            only_main_content=scrape_options.get("onlyMainContent"),
+            poll_interval=TRANSPORT_CONFIG["batch_poll_interval"],
+            wait_timeout=TRANSPORT_CONFIG["batch_wait_timeout"],
+        )
+        return {
+            canonical_url(document_url(document)): item_field(document, "markdown") or ""
+            for document in (job.data or [])
+        }
+
+
+class FirecrawlHttpBackend:
+    """Firecrawl v2 REST client on a pooled requests.Session"""
+
+    def __init__(self, api_key, config=None):
+        if not REQUESTS_AVAILABLE:
+            raise ImportError("requests is required for the HTTP transport")
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.config = config or TRANSPORT_CONFIG
+        self.api_url = self.config["api_url"].rstrip("/")
+        self.timeout = (self.config["connect_timeout"], self.config["read_timeout"])
+
+        # One session per backend: connections stay open between searches
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.config["pool_connections"],
+            pool_maxsize=self.config["pool_maxsize"],
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        )
+
+    def _request(self, method, path_or_url, payload=None):
+        url = path_or_url if "://" in path_or_url else f"{self.api_url}{path_or_url}"
+        response = self.session.request(method, url, json=payload, timeout=self.timeout)
+        if response.status_code >= 400:
+            raise TransportError(
+                f"Firecrawl returned {response.status_code}: {response.text[:200]}",
+                status_code=response.status_code,
+                response=response,
+            )
+        return response.json()
+
+    def search(self, query, limit=5, scrape_options=None, timeout=None, tbs=None):
+        """Search and return an object with a .web list, like the Firecrawl SDK"""
+        payload = {"query": query, "limit": limit}
+        if scrape_options:
+            payload["scrapeOptions"] = scrape_options
+        if timeout:
+            payload["timeout"] = timeout
+        if tbs:
+            payload["tbs"] = tbs
+
+        data = self._request("POST", "/v2/search", payload).get("data") or {}
+        return SimpleNamespace(web=[_to_namespace(item) for item in data.get("web", [])])
+
+    def scrape_urls(self, urls, scrape_options=None):
+        """Scrape many URLs with one batch job, return {canonical url: markdown}"""
+        payload = {"urls": list(urls)}
+        payload.update(scrape_options or {})
+        job = self._request("POST", "/v2/batch/scrape", payload)
+
+        status_url = f"/v2/batch/scrape/{job['id']}"
+        deadline = time.monotonic() + self.config["batch_wait_timeout"]
+        while True:
+            status = self._request("GET", status_url)
+            if status.get("status") in ("completed", "failed", "cancelled"):
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Batch scrape {job['id']} timed out")
+            time.sleep(self.config["batch_poll_interval"])
+
+        # Completed jobs can be paginated through "next"
+        documents = list(status.get("data") or [])
+        while status.get("next"):
+            status = self._request("GET", status["next"])
+            documents.extend(status.get("data") or [])
+
+        return {
+            canonical_url(document_url(document)): document.get("markdown") or ""
+            for document in documents
+        }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+On-disk cache for search responses
+Stores Firecrawl search responses in SQLite with a TTL and LRU eviction so
+repeated queries skip the network round trip and the rate limiter.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+
+def cache_key(query, limit, scrape_options, tbs=None):
+    """Hash the arguments that determine a search response"""
+    parts = [query, limit, scrape_options]
+    if tbs is not None:
+        parts.append(tbs)
+    encoded = json.dumps(parts, sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def serialize_response(response):
+    """Turn a search response into plain JSON-compatible data"""
+    items = []
+    for item in getattr(response, "web", None) or []:
+        if isinstance(item, dict):
+            items.append(dict(item))
+        elif hasattr(item, "model_dump"):
+            items.append(item.model_dump())
+        else:
+            items.append(dict(vars(item)))
+    return {"web": items}
+
+
+def deserialize_response(data):
+    """Rebuild a response object with the same attribute access as Firecrawl's"""
+    return SimpleNamespace(web=[SimpleNamespace(**item) for item in data["web"]])
+
+
+class SearchCache:
+    """SQLite-backed response cache with TTL expiry and size-bounded LRU eviction"""
+
+    def __init__(self, filename, ttl_seconds=86400, max_entries=10000):
+        self.filename = filename
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        # Searches run on worker threads, so share one connection behind a lock
+        self.lock = threading.Lock()
+        # Sharded runs share the file across processes, so wait out their locks
+        self.connection = sqlite3.connect(
+            filename, timeout=30, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self.connection.commit()
+
+    def get(self, query, limit, scrape_options, tbs=None):
+        """Return a cached response, or None when missing or expired"""
+        key = cache_key(query, limit, scrape_options, tbs)
+        now = time.time()
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[1] > self.ttl_seconds:
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.connection.commit()
+                row = None
+
+            if not row:
+                self.misses += 1
+                return None
+
+            self.connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.connection.commit()
+            self.hits += 1
+
+        return deserialize_response(json.loads(row[0]))
+
+    def put(self, query, limit, scrape_options, response, tbs=None):
+        """Store a response and evict the least recently used entries over the limit"""
+        key = cache_key(query, limit, scrape_options, tbs)
+        encoded = json.dumps(serialize_response(response), ensure_ascii=False)
+        now = time.time()
+
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, encoded, now, now),
+            )
+            self.connection.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self.connection.commit()
+
+    def close(self):
+        """Close the underlying database"""
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Seen-URL store
+Persistent record of every URL scraped by earlier runs and when its content
+was fetched, so a two-phase crawl only scrapes URLs that are new or stale.
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+
+from result_history import history_files, iter_results
+from url_index import canonical_url
+
+
+class SeenUrlStore:
+    """SQLite table of canonical URLs and the time their content was scraped"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, timeout=30)
+        self.connection.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS seen_urls (
+                url TEXT PRIMARY KEY,
+                scraped_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS imported_files (
+                filename TEXT PRIMARY KEY,
+                mtime REAL NOT NULL
+            );
+            """
+        )
+        self.connection.commit()
+
+    def import_results_files(self, pattern, result_store=None):
+        """Seed the store from search_results*.json files not imported yet
+
+        With a ResultStore, the results of those files are also added to it
+        unless it already holds their URL, so the content of URLs that are
+        not scraped again stays available.
+        """
+        imported = 0
+        columns = None if result_store is not None else ("url", "markdown", "timestamp")
+        results_files, _ = history_files(pattern)
+        for filename in results_files:
+            mtime = os.path.getmtime(filename)
+            row = self.connection.execute(
+                "SELECT mtime FROM imported_files WHERE filename = ?", (filename,)
+            ).fetchone()
+            if row and row[0] == mtime:
+                continue
+
+            try:
+                results = self._record_scrapes(iter_results(filename, columns))
+                if result_store is not None:
+                    imported += result_store.import_missing(results)
+                else:
+                    imported += sum(1 for _ in results)
+            except (OSError, ValueError):
+                continue
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO imported_files VALUES (?, ?)", (filename, mtime)
+            )
+            self.connection.commit()
+        return imported
+
+    def _record_scrapes(self, results):
+        """Record when each result dict's content was scraped, then pass it on"""
+        for result in results:
+            # Results saved without content still need scraping
+            scraped_at = None
+            if result.get("markdown") and result.get("timestamp"):
+                scraped_at = datetime.fromisoformat(result["timestamp"]).timestamp()
+            self._upsert(result.get("url", ""), scraped_at)
+            yield result
+
+    def _upsert(self, url, scraped_at):
+        # Keep the most recent scrape time seen for a URL
+        self.connection.execute(
+            """
+            INSERT INTO seen_urls VALUES (?, ?)
+            ON CONFLICT(url) DO UPDATE SET scraped_at = MAX(
+                COALESCE(scraped_at, 0), COALESCE(excluded.scraped_at, 0)
+            )
+            """,
+            (canonical_url(url), scraped_at),
+        )
+
+    def is_fresh(self, url, max_age_seconds, now):
+        """Whether the URL's content was scraped less than max_age_seconds ago"""
+        row = self.connection.execute(
+            "SELECT scraped_at FROM seen_urls WHERE url = ?", (canonical_url(url),)
+        ).fetchone()
+        return bool(row and row[0] and now - row[0] < max_age_seconds)
+
+    def mark_scraped(self, urls, scraped_at):
+        """Record that the content of these URLs was fetched"""
+        for url in urls:
+            self._upsert(url, scraped_at)
+        self.connection.commit()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM seen_urls").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
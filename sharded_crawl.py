@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Sharded crawl across API keys
+Partitions the query table by hash across worker processes, each with its own
+Firecrawl key, rate limiter and shard-local checkpoints, then merges the
+shards into one deduplicated search_results.json.
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from progress_journal import query_key
+from result_records import QueryTable, SearchResult, write_results_document
+from url_index import UrlIndex
+
+
+def shard_of(query_obj, num_shards):
+    """Deterministic shard index of a query, stable across runs and machines"""
+    return int(query_key(query_obj), 16) % num_shards
+
+
+def shard_base_filename(shard_index, base_filename="search_results"):
+    return f"{base_filename}_shard{shard_index}"
+
+
+def run_shard(shard_index, num_shards, api_key, queries_file, backend_factory=None):
+    """Scrape one shard in the current process and return its results file
+
+    backend_factory(api_key) can return a stub search backend for local runs;
+    it must be a module-level function so it can be sent to worker processes.
+    """
+    from reddit_scraper import RedditSearchScraper
+
+    base_filename = shard_base_filename(shard_index)
+    backend = backend_factory(api_key) if backend_factory else None
+    scraper = RedditSearchScraper(
+        queries_file,
+        search_backend=backend,
+        api_key=api_key,
+        base_filename=base_filename,
+    )
+
+    # Each shard resumes from its own journal
+    progress_file = f"{base_filename}_progress.jsonl"
+    if os.path.exists(progress_file):
+        scraper.load_existing_progress(progress_file)
+
+    queries = (
+        query_obj
+        for query_obj in scraper.iter_queries_from_json(queries_file)
+        if shard_of(query_obj, num_shards) == shard_index
+    )
+    print(f"🧩 Shard {shard_index + 1}/{num_shards} starting")
+    scraper.scrape_and_save(queries=scraper.plan_queries(queries))
+
+    results_file = scraper.save_results()
+    if os.path.exists(progress_file):
+        os.remove(progress_file)
+    return results_file
+
+
+def run_sharded(queries_file, api_keys, backend_factory=None):
+    """Run one worker process per API key and return the shard result files"""
+    num_shards = len(api_keys)
+    print(f"🚀 Starting sharded crawl with {num_shards} workers...")
+
+    with ProcessPoolExecutor(max_workers=num_shards) as executor:
+        futures = [
+            executor.submit(
+                run_shard, shard_index, num_shards, api_key, queries_file, backend_factory
+            )
+            for shard_index, api_key in enumerate(api_keys)
+        ]
+        return [future.result() for future in futures]
+
+
+def merge_shards(shard_files, output_file="search_results.json"):
+    """Merge shard result files into one document, deduplicated by canonical URL"""
+    url_index = UrlIndex()
+    query_table = QueryTable()
+    merged = []
+
+    for filename in shard_files:
+        with open(filename, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for result in data.get("results", []):
+            if url_index.add(result.get("url", "")):
+                merged.append(SearchResult.from_dict(result, query_table))
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        write_results_document(f, merged, datetime.now().isoformat())
+
+    print(f"🔗 Merged {len(shard_files)} shards into {len(merged)} results in {output_file}")
+    return output_file
+
+
+def main(queries_file=None):
+    """Run a sharded crawl with the keys in FIRECRAWL_API_KEYS (comma-separated)"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    if queries_file is None:
+        queries_file = sys.argv[1] if len(sys.argv) > 1 else "discovery_queries.json"
+    if not os.path.exists(queries_file):
+        print(f"❌ Query file {queries_file} not found.")
+        return
+
+    api_keys = [
+        key.strip() for key in os.getenv("FIRECRAWL_API_KEYS", "").split(",") if key.strip()
+    ]
+    if not api_keys:
+        print("❌ Set FIRECRAWL_API_KEYS to a comma-separated list of API keys")
+        return
+
+    shard_files = run_sharded(queries_file, api_keys)
+    output_file = merge_shards(shard_files)
+    print(f"\n✅ Sharded crawl completed! Results saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
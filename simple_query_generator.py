@@ -4,83 +4,62 @@ Simple Query Generator - Just generates queries, nothing else
 """
 
 import json
+import sys
+from collections import Counter
+from datetime import datetime
 
+from query_engine import QueryEngine
+from query_loader import write_queries_jsonl
 
-def generate_queries():
-    """Generate focused discovery queries for business subreddits only (50-60 queries max)"""
 
-    # Core business subreddits only
-    business_subreddits = [
-        "entrepreneur",
-        "startups",
-        "smallbusiness",
-        "business",
-        "marketing",
-        "sales",
-        "SaaS",
-        "ecommerce",
-        "freelance",
-        "consulting",
-    ]
+def generate_queries(engine=None):
+    """Generate focused discovery queries for business subreddits (GENERATOR_CONFIG)"""
+    engine = engine or QueryEngine(history_files=[])
+    return list(engine.generate())
 
-    # Core question patterns (focused on business struggles)
-    core_patterns = [
-        "how do I",
-        "struggling with",
-        "need help with",
-        "can't figure out",
-        "my business",
-        "looking for",
-    ]
 
-    queries = []
-
-    # Generate 5-6 queries per subreddit (50-60 total)
-    for subreddit in business_subreddits:
-        for pattern in core_patterns:
-            query = f"{pattern} site:reddit.com/r/{subreddit}"
-            queries.append(
-                {
-                    "query": query,
-                    "type": "subreddit_question",
-                    "subreddit": subreddit,
-                    "category": "subreddit_specific",
-                }
-            )
-
-    return queries
-
-
-def main():
+def main(output_file=None):
     """Generate and save queries"""
     print("🔍 Generating discovery queries...")
 
-    queries = generate_queries()
+    if output_file is None:
+        output_file = sys.argv[1] if len(sys.argv) > 1 else "discovery_queries.json"
+    engine = QueryEngine()
+
+    # JSONL output is written lazily, so large query spaces never sit in memory
+    if output_file.endswith(".jsonl"):
+        count = write_queries_jsonl(engine.generate(), output_file)
+        print(f"💾 Saved {count} queries to {output_file}")
+        print(f"♻️  Skipped {engine.duplicates} near-duplicates, pruned {engine.pruned} dead queries")
+        return
+
+    queries = generate_queries(engine)
 
     # Create JSON structure with metadata
     data = {
         "metadata": {
             "total_queries": len(queries),
-            "generated_at": "2024-01-01T00:00:00Z",
+            "generated_at": datetime.now().isoformat(),
             "description": "Focused discovery queries for business subreddits only",
-            "query_types": {"subreddit_question": len(queries)},
+            "query_types": dict(Counter(q["type"] for q in queries)),
             "subreddits": list(
                 set([q["subreddit"] for q in queries if q["subreddit"] is not None])
             ),
-            "categories": ["subreddit_specific"],
+            "categories": sorted(set(q["category"] for q in queries)),
         },
         "queries": queries,
     }
 
     # Save to file
-    with open("discovery_queries.json", "w", encoding="utf-8") as f:
+    with open(output_file, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
-    print(f"💾 Saved {len(queries)} queries to discovery_queries.json")
+    print(f"💾 Saved {len(queries)} queries to {output_file}")
     print(f"📊 Total queries: {len(queries)}")
     print(f"📈 Query types: {data['metadata']['query_types']}")
     print(f"🏷️  Subreddits: {len(data['metadata']['subreddits'])}")
     print(f"📂 Categories: {data['metadata']['categories']}")
+    print(f"♻️  Skipped {engine.duplicates} near-duplicates, pruned {engine.pruned} dead queries")
 
 
 if __name__ == "__main__":
@@ -1,48 +1,93 @@
 #!/usr/bin/env python3
 """
-Test version of Reddit Scraper - runs only a few queries for testing
+Test version of Reddit Scraper - runs a few queries against FakeFirecrawl,
+offline and without an API key, and checks the results and the journal
+
+    python3 -m pytest test_scraper.py
 """
 
 import json
 import os
-from reddit_scraper import RedditUserInsightsScraper
+import tempfile
 
+from fake_firecrawl import FakeFirecrawl
+from progress_journal import QUERY_EMPTY, QUERY_OK, ProgressJournal, query_key
+from rate_limiter import TokenBucket
+from reddit_scraper import RedditSearchScraper
 
-def test_scraper():
-    """Test the scraper with a small subset of queries"""
-    print("🧪 Testing Reddit Scraper with limited queries...")
+RESULTS_PER_QUERY = 3
+TEST_QUERIES = [
+    {
+        "query": f"{pattern} site:reddit.com/r/{subreddit}",
+        "type": "subreddit_question",
+        "subreddit": subreddit,
+        "category": "subreddit_specific",
+    }
+    for subreddit in ("startups", "SaaS")
+    for pattern in ("how do I", "struggling with")
+]
 
-    # Load queries
-    query_file = "discovery_queries.json"
-    scraper = RedditUserInsightsScraper(query_file)
-    all_queries = scraper.load_queries_from_json(query_file)
 
-    if not all_queries:
-        print("❌ No queries loaded. Exiting.")
-        return
+def run_test_scrape():
+    """Scrape TEST_QUERIES into the current directory, return the scraper"""
+    scraper = RedditSearchScraper(
+        search_backend=FakeFirecrawl(results_per_query=RESULTS_PER_QUERY),
+        # No waiting between searches; FakeFirecrawl has no quota
+        rate_limiter=TokenBucket(60_000, len(TEST_QUERIES)),
+        search_cache=False,
+    )
+    scraper.scrape_and_save(
+        queries=TEST_QUERIES,
+        limit_per_query=RESULTS_PER_QUERY,
+        progress_save=True,
+        concurrency=2,
+    )
+    return scraper
 
-    # Test with just the first 5 queries
-    test_queries = all_queries[:5]
-    print(f"🧪 Testing with {len(test_queries)} queries:")
-    for i, query in enumerate(test_queries, 1):
-        print(f"  {i}. {query}")
 
-    print("\n🚀 Starting test scrape...")
+def test_scraper(tmp_path, monkeypatch):
+    """Results are linked to their queries and checkpointed in the journal"""
+    monkeypatch.chdir(tmp_path)
+    scraper = run_test_scrape()
+    results = scraper.search_results
 
-    # Run the scraper
-    insights = scraper.scrape_and_save(queries=test_queries, limit_per_query=1)
+    assert results
+    assert len(results) <= len(TEST_QUERIES) * RESULTS_PER_QUERY
+    urls = [result.url for result in results]
+    assert len(set(urls)) == len(urls)
+    query_texts = {query_obj["query"] for query_obj in TEST_QUERIES}
+    for result in results:
+        assert result.query.query in query_texts
+        assert result.markdown
+        assert result.insight_intensity >= scraper.insight_analyzer.min_intensity
 
-    # Display results
-    scraper.display_summary()
+    # Every result and every query outcome is in the journal
+    journal = tmp_path / "search_results_progress.jsonl"
+    journal_urls = [result["url"] for result in ProgressJournal.read_results(journal)]
+    assert journal_urls == urls
+    statuses = ProgressJournal.read_query_statuses(journal)
+    per_query = {query_obj["query"]: 0 for query_obj in TEST_QUERIES}
+    for result in results:
+        per_query[result.query.query] += 1
+    assert statuses == {
+        query_key(query_obj): QUERY_OK if per_query[query_obj["query"]] else QUERY_EMPTY
+        for query_obj in TEST_QUERIES
+    }
 
-    # Save test results
-    if insights:
-        test_filename = "test_results.json"
-        scraper.save_results(test_filename)
-        print(f"\n✅ Test completed! Results saved to: {test_filename}")
-    else:
-        print("\n❌ No results found in test.")
+    # The saved document holds the same results
+    scraper.save_results(str(tmp_path / "test_results.json"))
+    with open(tmp_path / "test_results.json", "r", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["total_results"] == len(results)
+    assert [result["url"] for result in data["results"]] == urls
 
 
 if __name__ == "__main__":
-    test_scraper()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            scraper = run_test_scrape()
+            scraper.display_summary()
+        finally:
+            os.chdir(cwd)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+URL deduplication index
+Keeps canonical forms of every URL seen so duplicates are dropped on arrival.
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Reddit serves the same thread on all of these hosts
+REDDIT_HOST_PREFIXES = ("www.", "old.", "new.", "np.", "m.", "i.")
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "ref",
+    "ref_source",
+    "ref_campaign",
+    "context",
+    "share_id",
+    "rdt",
+    "st",
+    "sh",
+    "fbclid",
+    "gclid",
+}
+
+
+def canonical_url(url):
+    """Normalize a URL so variants of the same page compare equal"""
+    if not url:
+        return ""
+
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith("reddit.com"):
+        for prefix in REDDIT_HOST_PREFIXES:
+            if host.startswith(prefix):
+                host = host[len(prefix) :]
+                break
+
+    # Keep non-default ports, drop credentials
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or "/"
+
+    params = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    ]
+    query = urlencode(sorted(params))
+
+    # http/https and fragments never change the content we scrape
+    return urlunsplit(("https", host, path, query, ""))
+
+
+class UrlIndex:
+    """Set of canonical URLs with O(1) membership and insert"""
+
+    def __init__(self, urls=()):
+        self.seen = set()
+        for url in urls:
+            self.add(url)
+
+    def add(self, url):
+        """Add a URL, return False if an equivalent URL was already indexed"""
+        key = canonical_url(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        return True
+
+    def discard(self, url):
+        """Forget a URL (and its equivalents), e.g. when its result was lost"""
+        self.seen.discard(canonical_url(url))
+
+    def __contains__(self, url):
+        return canonical_url(url) in self.seen
+
+    def __len__(self):
+        return len(self.seen)